@@ -1,7 +1,8 @@
 # Forth extensions
 
 from forth_vm import ForthVM
-import sys
+import MemExt
+import sys, os
 
 # ==================== Primitives ====================
 
@@ -37,55 +38,103 @@ def do_ashift(vm):
     u = vm.pop(); x = vm.pop()
     vm.push(x >> u)  # arithmetic shift
 
+# PYTHON file cache: fname -> (mtime, code object), shared by all VMs
+_py_code = {}
+
 def do_python(vm):
     """Load and execute a Python file with access to the current VM.
-       If the file defines install(vm), it will be called automatically."""
+       If the file defines install(vm), it will be called automatically.
+       A file this VM already loaded is skipped while its mtime is unchanged
+       (and no FORGET has run since); other VMs reuse the compiled code."""
     fname = vm._next_token()
     if not fname:
         raise RuntimeError("PYTHON requires a filename")
     try:
-        with open(fname, "r") as f:
-            code = f.read()
-            ns = {"vm": vm}
-            exec(code, ns)
-            if "install" in ns and callable(ns["install"]):
-                ns["install"](vm)
+        mtime = os.stat(fname)[8]
+        if vm._py_loaded.get(fname) == (mtime, vm._cut_version):
+            return
+        cached = _py_code.get(fname)
+        if cached is None or cached[0] != mtime:
+            with open(fname, "r") as f:
+                cached = _py_code[fname] = (mtime, compile(f.read(), fname, "exec"))
+        ns = {"vm": vm}
+        exec(cached[1], ns)
+        if "install" in ns and callable(ns["install"]):
+            ns["install"](vm)
+        vm._py_loaded[fname] = (mtime, vm._cut_version)
+        if fname not in vm.py_files:
+            vm.py_files.append(fname)   # rerun by LOAD-IMAGE
     except Exception as e:
         raise RuntimeError(f"PYTHON error loading {fname}: {e}")
 
 # ==================== Inline Python <P ... P> ====================
 
+def _make_run_python(src, persist=False):
+    # make_op factory, so compiled <P ... P> code survives SAVE-IMAGE.
+    # The source is compiled once here, not on every run.
+    code = compile(src, "<P>", "exec")
+    if persist:
+        ns = {}
+        def _run_python(vmm):
+            vmm.out.flush()     # keep print() after earlier word output
+            ns["vm"] = vmm
+            exec(code, ns)
+    else:
+        def _run_python(vmm):
+            vmm.out.flush()
+            exec(code, {"vm": vmm})
+    return _run_python
+
 def do_p_start(vm):
     """Enter Python capture mode until a line with just P>."""
     vm._py_lines = []
+    vm._py_persist = False
+
+def do_p_start_persist(vm):
+    """<P+ ... P>: like <P, but a compiled block keeps its globals between runs."""
+    do_p_start(vm)
+    vm._py_persist = True
 
 def do_p_end(vm):
     """Execute the captured Python code (interpret or compile)."""
     if not hasattr(vm, "_py_lines"):
         raise RuntimeError("P> without <P")
     code = "\n".join(vm._py_lines)
+    persist = vm._py_persist
     del vm._py_lines
     if vm.compiling:
         # Compile-time: emit runtime exec of this code
-        def _run_python(vmm, src=code):
-            exec(src, {"vm": vmm})
-        vm._emit_op(_run_python)
+        vm._emit_op(vm.make_op("<P", code, persist))
     else:
         # Interpret-time: run immediately
+        vm.out.flush()
         exec(code, {"vm": vm})
 
-# Patch interpret AFTER ForthVM is imported
+def _capture_py(vm, line):
+    """Between <P and P> lines are Python source: take line, True if taken."""
+    if not hasattr(vm, "_py_lines"):
+        return False
+    if line.strip().upper() == "P>":
+        do_p_end(vm)
+    else:
+        vm._py_lines.append(line.rstrip("\n"))
+    return True
+
+# Patch interpret and ainterpret AFTER ForthVM is imported
 _old_interpret = ForthVM.interpret
 def _interpret_with_py(self, line):
-    if hasattr(self, "_py_lines"):
-        if line.strip().upper() == "P>":
-            do_p_end(self)
-        else:
-            self._py_lines.append(line.rstrip("\n"))
+    if _capture_py(self, line):
         return
     return _old_interpret(self, line)
 
+_old_ainterpret = ForthVM.ainterpret
+async def _ainterpret_with_py(self, line):
+    if _capture_py(self, line):
+        return
+    return await _old_ainterpret(self, line)
+
 ForthVM.interpret = _interpret_with_py
+ForthVM.ainterpret = _ainterpret_with_py
 
 # ==================== Install ====================
 
@@ -103,12 +152,25 @@ def install_extn(vm):
     vm.add_fn("XOR", do_xor)
     vm.add_fn("INVERT", do_invert)
 
+    # MOVE, CMOVE, CMOVE>, FILL, ERASE
+    MemExt.install(vm)
+
     # Python loader
     vm.add_fn("PYTHON", do_python)
+    vm._py_loaded = {}      # fname -> (mtime, FORGET count) of files loaded
 
     # Inline Python
     vm.add_fn("<P", do_p_start, immediate=True)
+    vm.add_fn("<P+", do_p_start_persist, immediate=True)
     vm.add_fn("P>", do_p_end)
+    vm.register_factory("<P", _make_run_python)
+
+    # PAR-MAP over worker processes (no multiprocessing on boards)
+    try:
+        import forth_par
+        forth_par.install(vm, install_extn)
+    except ImportError:
+        pass
 
     # Example high-level word
     vm.interpret(': hi ." Hello ... " cr ;')
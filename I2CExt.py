@@ -1,10 +1,35 @@
 # I2CExt.py
 
 from machine import Pin, I2C
+from forth_vm import TYPED_CELL
+from array import array
+
+def _make_i2c_send(text):
+    # make_op factory for compiled I2C" (so it survives SAVE-IMAGE)
+    data = text.encode()
+    def _i2c_send(vm2):
+        bus  = vm2.pop()
+        addr = vm2.pop()
+        vm2.i2c_buses[bus].writeto(addr, data)
+    return _i2c_send
 
 def install(vm):
     # store multiple I2C buses by index
     vm.i2c_buses = {}
+    # bus -> bytearray memoryview, grown to the largest transfer so far
+    vm.i2c_bufs = {}
+    # queued register ops: (kind "R"/"W", bus, dev, reg, heap addr / value)
+    vm.i2c_queue = []
+
+    def buffer(vmm, bus, n):
+        buf = vmm.i2c_bufs.get(bus)
+        if buf is None or len(buf) < n:
+            buf = vmm.i2c_bufs[bus] = memoryview(bytearray(max(n, 16)))
+        return buf[:n]
+
+    def span(vmm, name, addr, n):
+        if n < 0 or addr < 0 or addr + n > len(vmm.heap):
+            raise RuntimeError(f"{name}: {addr}+{n} outside the heap")
 
     def do_i2c_init(vmm):
         freq  = vmm.pop()
@@ -17,7 +42,7 @@ def install(vm):
         bus   = vmm.pop()   # which bus to use
         addr  = vmm.pop()
         reg   = vmm.pop()
-        data = bytearray(1)
+        data = buffer(vmm, bus, 1)
         vmm.i2c_buses[bus].readfrom_mem_into(addr, reg, data)
         vmm.push(data[0])
 
@@ -26,29 +51,91 @@ def install(vm):
         addr  = vmm.pop()
         reg   = vmm.pop()
         val   = vmm.pop()
-        vmm.i2c_buses[bus].writeto_mem(addr, reg, bytes([val]))
+        data = buffer(vmm, bus, 1)
+        data[0] = val
+        vmm.i2c_buses[bus].writeto_mem(addr, reg, data)
+
+    # ----- Block transfers: n registers from reg on, one bus transaction -----
+    def do_i2c_read_into(vmm):
+        # ( addr n reg dev bus -- ) registers reg.. into cells addr..addr+n-1
+        bus = vmm.pop(); dev = vmm.pop(); reg = vmm.pop(); n = vmm.pop(); addr = vmm.pop()
+        span(vmm, "I2C-READ-INTO", addr, n)
+        data = buffer(vmm, bus, n)
+        vmm.i2c_buses[bus].readfrom_mem_into(dev, reg, data)
+        vmm.heap[addr:addr+n] = array(TYPED_CELL, data) if vmm.typed_heap else data
+
+    def do_i2c_write_from(vmm):
+        # ( addr n reg dev bus -- ) cells addr..addr+n-1 to registers reg..
+        bus = vmm.pop(); dev = vmm.pop(); reg = vmm.pop(); n = vmm.pop(); addr = vmm.pop()
+        span(vmm, "I2C-WRITE-FROM", addr, n)
+        data = buffer(vmm, bus, n)
+        data[:] = array("B", vmm.heap[addr:addr+n])
+        vmm.i2c_buses[bus].writeto_mem(dev, reg, data)
+
+    # ----- Transaction queue: I2C-Q! / I2C-Q@ queue, I2C-FLUSH runs them -----
+    # Queued ops to consecutive registers of one device (same kind, in
+    # order) go out as one block transaction; the device must auto-increment
+    # its register address, as nearly all do.
+    def do_i2c_queue_write(vmm):
+        # ( val reg dev bus -- )
+        bus = vmm.pop(); dev = vmm.pop(); reg = vmm.pop(); val = vmm.pop()
+        vmm.i2c_queue.append(("W", bus, dev, reg, val))
+
+    def do_i2c_queue_read(vmm):
+        # ( addr reg dev bus -- ) the register lands in cell addr at I2C-FLUSH
+        bus = vmm.pop(); dev = vmm.pop(); reg = vmm.pop(); addr = vmm.pop()
+        span(vmm, "I2C-Q@", addr, 1)
+        vmm.i2c_queue.append(("R", bus, dev, reg, addr))
+
+    def do_i2c_flush(vmm):
+        # A failed transfer leaves it and the ops after it queued (the ones
+        # before it are done): I2C-FLUSH retries them, I2C-Q-CLEAR drops them
+        q = vmm.i2c_queue
+        heap = vmm.heap
+        i = 0
+        while i < len(q):
+            kind, bus, dev, reg, _ = q[i]
+            j = i + 1
+            while j < len(q) and q[j][:3] == (kind, bus, dev) and q[j][3] == reg + j - i:
+                j += 1
+            try:
+                data = buffer(vmm, bus, j - i)
+                if kind == "W":
+                    for k in range(i, j): data[k-i] = q[k][4]
+                    vmm.i2c_buses[bus].writeto_mem(dev, reg, data)
+                else:
+                    vmm.i2c_buses[bus].readfrom_mem_into(dev, reg, data)
+                    for k in range(i, j): heap[q[k][4]] = data[k-i]
+            except Exception as e:
+                del q[:i]
+                raise RuntimeError(f"I2C-FLUSH: {len(q)} queued ops not applied, "
+                                   f"from bus {bus} dev {dev} reg {reg}: {e}")
+            i = j
+        del q[:]
+
+    def do_i2c_queue_clear(vmm):
+        del vmm.i2c_queue[:]
 
     def do_i2c_string(vmm):
         """I2C" ...": send a string literal to an I2C device (interpret or compile)."""
-        raw = vmm._next_line()
-        if raw is None or '"' not in raw:
-            raise RuntimeError('Unterminated string for I2C"')
-        string, _ = raw.split('"', 1)
+        string = vmm._parse_string('I2C"')
 
         if vmm.compiling:
-            def _i2c_send(vm2, s=string):
-                bus  = vm2.pop()
-                addr = vm2.pop()
-                vm2.i2c_buses[bus].writeto(addr, s.encode())
-            vmm._emit_op(_i2c_send)
+            vmm._emit_op(vmm.make_op('I2C"', string))
         else:
             bus  = vmm.pop()
             addr = vmm.pop()
             vmm.i2c_buses[bus].writeto(addr, string.encode())
 
     vmm = vm
+    vmm.register_factory('I2C"', _make_i2c_send)
     vmm.add_fn("/I2C", do_i2c_init)
     vmm.add_fn("I2C@", do_i2c_read)
     vmm.add_fn("I2C!", do_i2c_write)
+    vmm.add_fn("I2C-READ-INTO", do_i2c_read_into)
+    vmm.add_fn("I2C-WRITE-FROM", do_i2c_write_from)
+    vmm.add_fn("I2C-Q!", do_i2c_queue_write)
+    vmm.add_fn("I2C-Q@", do_i2c_queue_read)
+    vmm.add_fn("I2C-FLUSH", do_i2c_flush)
+    vmm.add_fn("I2C-Q-CLEAR", do_i2c_queue_clear)
     vmm.add_fn('I2C"', do_i2c_string, immediate=True)
-
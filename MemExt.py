@@ -0,0 +1,65 @@
+# MemExt.py
+# Block memory words, each one slice assignment over the heap
+#
+#   MOVE   ( src dst u -- )   copy u cells (overlap safe)
+#   CMOVE  ( src dst u -- )   copy low to high, cell by cell
+#   CMOVE> ( src dst u -- )   copy high to low, cell by cell
+#   FILL   ( addr u char -- ) set u cells to char
+#   ERASE  ( addr u -- )      set u cells to 0
+#
+# Installed by Extn.install_extn; alone: PYTHON MemExt.py, or
+# MemExt.install(vm) from Python. Ranges are checked against the heap.
+
+from forth_vm import TYPED_CELL
+from array import array
+
+
+def _span(vm, name, a, u):
+    if a < 0 or a + u > len(vm.heap):
+        raise RuntimeError(f"{name}: {a}+{u} outside the heap")
+
+def _copy(vm, name, up):
+    # up: CMOVE order (low to high), else CMOVE> (high to low); they
+    # differ from MOVE only when the ranges overlap the "wrong" way
+    u = vm.pop(); d = vm.pop(); s = vm.pop()
+    if u <= 0: return
+    _span(vm, name, s, u); _span(vm, name, d, u)
+    heap = vm.heap
+    if up is True and s < d < s + u:
+        for i in range(u): heap[d+i] = heap[s+i]
+    elif up is False and d < s < d + u:
+        for i in range(u-1, -1, -1): heap[d+i] = heap[s+i]
+    else:
+        heap[d:d+u] = heap[s:s+u]
+
+def _fill(vm, name, a, u, c):
+    if u <= 0: return
+    _span(vm, name, a, u)
+    heap = vm.heap
+    heap[a:a+u] = array(TYPED_CELL, [c]) * u if vm.typed_heap else [c] * u
+
+
+def do_move(vm):
+    _copy(vm, "MOVE", None)
+
+def do_cmove(vm):
+    _copy(vm, "CMOVE", True)
+
+def do_cmove_up(vm):
+    _copy(vm, "CMOVE>", False)
+
+def do_fill(vm):
+    c = vm.pop(); u = vm.pop()
+    _fill(vm, "FILL", vm.pop(), u, c & 0xFF)
+
+def do_erase(vm):
+    u = vm.pop()
+    _fill(vm, "ERASE", vm.pop(), u, 0)
+
+
+def install(vm):
+    vm.add_fn("MOVE", do_move)
+    vm.add_fn("CMOVE", do_cmove)
+    vm.add_fn("CMOVE>", do_cmove_up)
+    vm.add_fn("FILL", do_fill)
+    vm.add_fn("ERASE", do_erase)
@@ -1,10 +1,23 @@
 # SPIExt.py
 
 from machine import Pin, SPI
+from forth_vm import TYPED_CELL
+from array import array
+
+def _make_spi_send(text):
+    # make_op factory for compiled SPI" (so it survives SAVE-IMAGE)
+    data = text.encode()
+    def _spi_send(vm2):
+        bus = vm2.pop()
+        vm2.spi_buses[bus].write(data)
+    return _spi_send
 
 def install(vm):
     # store multiple SPI buses by index
     vm.spi_buses = {}
+    # bus -> (tx, rx) bytearrays, grown to the largest transfer so far;
+    # bulk words reuse them instead of allocating per call
+    vm.spi_bufs = {}
 
     def do_spi_init(vmm):
         baud   = vmm.pop()
@@ -26,39 +39,71 @@ def install(vm):
         bus    = vmm.pop()
         nbytes = vmm.pop()
         buf = vmm.spi_buses[bus].read(nbytes)
-        for b in buf[::-1]:   # push in reverse so stack order is b0 ... b[n-1]
-            vmm.push(b)
+        vmm.S.extend(buf[::-1])   # reversed, so b0 ends up on top
 
     def do_spi_write(vmm):
         bus    = vmm.pop()
         nbytes = vmm.pop()
-        data = []
-        for _ in range(nbytes):
-            data.insert(0, vmm.pop())  # reversed collection
-        vmm.spi_buses[bus].write(bytes(data))
+        S = vmm.S
+        if nbytes > len(S): raise RuntimeError("Stack underflow")
+        data = bytes(S[len(S)-nbytes:])     # deepest byte is sent first
+        del S[len(S)-nbytes:]
+        vmm.spi_buses[bus].write(data)
+
+    # ----- Bulk transfers between heap cells (one byte each) and the bus -----
+    def buffers(vmm, bus, addr, n):
+        if n < 0 or addr < 0 or addr + n > len(vmm.heap):
+            raise RuntimeError(f"SPI: {addr}+{n} outside the heap")
+        bufs = vmm.spi_bufs.get(bus)
+        if bufs is None or len(bufs[0]) < n:
+            bufs = vmm.spi_bufs[bus] = (memoryview(bytearray(n)), memoryview(bytearray(n)))
+        return vmm.spi_buses[bus], bufs[0][:n], bufs[1][:n]
+
+    def to_heap(vmm, addr, mv):
+        n = len(mv)
+        vmm.heap[addr:addr+n] = array(TYPED_CELL, mv) if vmm.typed_heap else mv
+
+    def do_spi_read_into(vmm):
+        # ( addr n bus -- ) read n bytes into cells addr..addr+n-1
+        bus = vmm.pop(); n = vmm.pop(); addr = vmm.pop()
+        spi, _, rx = buffers(vmm, bus, addr, n)
+        spi.readinto(rx)
+        to_heap(vmm, addr, rx)
+
+    def do_spi_write_from(vmm):
+        # ( addr n bus -- ) send cells addr..addr+n-1 as bytes
+        bus = vmm.pop(); n = vmm.pop(); addr = vmm.pop()
+        spi, tx, _ = buffers(vmm, bus, addr, n)
+        tx[:] = array("B", vmm.heap[addr:addr+n])
+        spi.write(tx)
+
+    def do_spi_xfer(vmm):
+        # ( src dst n bus -- ) full duplex: send src cells, receive into dst
+        bus = vmm.pop(); n = vmm.pop(); dst = vmm.pop(); src = vmm.pop()
+        spi, tx, rx = buffers(vmm, bus, src, n)
+        buffers(vmm, bus, dst, n)
+        tx[:] = array("B", vmm.heap[src:src+n])
+        spi.write_readinto(tx, rx)
+        to_heap(vmm, dst, rx)
 
     def do_spi_string(vmm):
         """SPI" ...": send a string literal over SPI (interpret or compile)."""
-        # Get the rest of the current line from the input buffer
-        raw = vmm._next_line()
-        if raw is None or '"' not in raw:
-            raise RuntimeError('Unterminated string for SPI"')
-        string, _ = raw.split('"', 1)
+        string = vmm._parse_string('SPI"')
 
         if vmm.compiling:
             # Compile-time: emit a runtime action
-            def _spi_send(vm2, s=string):
-                bus = vm2.pop()
-                vm2.spi_buses[bus].write(s.encode())
-            vmm._emit_op(_spi_send)
+            vmm._emit_op(vmm.make_op('SPI"', string))
         else:
             # Interpret-time: send immediately
             bus = vmm.pop()
             vmm.spi_buses[bus].write(string.encode())
 
     vmm = vm
+    vmm.register_factory('SPI"', _make_spi_send)
     vmm.add_fn("/SPI", do_spi_init)
     vmm.add_fn("SPI@", do_spi_read)
     vmm.add_fn("SPI!", do_spi_write)
+    vmm.add_fn("SPI-READ-INTO", do_spi_read_into)
+    vmm.add_fn("SPI-WRITE-FROM", do_spi_write_from)
+    vmm.add_fn("SPI-XFER", do_spi_xfer)
     vmm.add_fn('SPI"', do_spi_string, immediate=True)
-
@@ -0,0 +1,114 @@
+# Vector words over heap ranges
+#
+#   V+     ( a b c n -- )   c[i] = a[i] + b[i]
+#   V*     ( a b c n -- )   c[i] = a[i] * b[i]
+#   VSCALE ( a n k -- )     a[i] = a[i] * k
+#   VSUM   ( a n -- sum )
+#   VDOT   ( a b n -- dot )
+#   VMAX   ( a n -- max )
+#   VSORT  ( a n -- )       ascending, in place
+#
+# Load with PYTHON VecExt.py, or VecExt.install(vm) from Python.
+# With NumPy and heap="typed" the words run on arrays sharing the heap's
+# memory (no copies; results wrap at the cell size like the array does).
+# With a list heap NumPy works on a copy of the range; without NumPy
+# (MicroPython) it is plain slices, still one word instead of a DO/LOOP.
+
+from forth_vm import TYPED_CELL
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _check(vm, name, a, n):
+    if n < 0 or a < 0 or a + n > len(vm.heap):
+        raise RuntimeError(f"{name}: {a}+{n} outside the heap")
+
+def _shared(vm):
+    return np is not None and vm.typed_heap
+
+def _cells(vm, a, n):
+    # NumPy array on cells a..a+n-1: a view of a typed heap, else a copy.
+    # Views are dropped before the word returns, so the heap can still grow.
+    heap = vm.heap
+    if vm.typed_heap:
+        return np.frombuffer(heap, dtype=TYPED_CELL, count=n, offset=a * heap.itemsize)
+    return np.array(heap[a:a+n])
+
+def _put(vm, a, values):
+    heap = vm.heap
+    heap[a:a+len(values)] = array(TYPED_CELL, values) if vm.typed_heap else values
+
+
+def _binary(vm, name, ufunc, op):
+    n = vm.pop(); c = vm.pop(); b = vm.pop(); a = vm.pop()
+    for x in (a, b, c): _check(vm, name, x, n)
+    if _shared(vm):
+        ufunc(_cells(vm, a, n), _cells(vm, b, n), out=_cells(vm, c, n))
+    elif np is not None:
+        _put(vm, c, ufunc(_cells(vm, a, n), _cells(vm, b, n)).tolist())
+    else:
+        heap = vm.heap
+        _put(vm, c, [op(x, y) for x, y in zip(heap[a:a+n], heap[b:b+n])])
+
+def v_add(vm):
+    _binary(vm, "V+", np and np.add, lambda x, y: x + y)
+
+def v_mul(vm):
+    _binary(vm, "V*", np and np.multiply, lambda x, y: x * y)
+
+def v_scale(vm):
+    k = vm.pop(); n = vm.pop(); a = vm.pop()
+    _check(vm, "VSCALE", a, n)
+    if _shared(vm):
+        v = _cells(vm, a, n)
+        np.multiply(v, k, out=v)
+    else:
+        _put(vm, a, [x * k for x in vm.heap[a:a+n]])
+
+def v_sum(vm):
+    n = vm.pop(); a = vm.pop()
+    _check(vm, "VSUM", a, n)
+    if _shared(vm):
+        vm.push(int(_cells(vm, a, n).sum()))
+    else:
+        vm.push(sum(vm.heap[a:a+n]))
+
+def v_dot(vm):
+    n = vm.pop(); b = vm.pop(); a = vm.pop()
+    _check(vm, "VDOT", a, n); _check(vm, "VDOT", b, n)
+    if np is not None:
+        vm.push(int(np.dot(_cells(vm, a, n), _cells(vm, b, n))))
+    else:
+        heap = vm.heap
+        vm.push(sum(x * y for x, y in zip(heap[a:a+n], heap[b:b+n])))
+
+def v_max(vm):
+    n = vm.pop(); a = vm.pop()
+    _check(vm, "VMAX", a, n)
+    if n == 0: raise RuntimeError("VMAX of an empty range")
+    if _shared(vm):
+        vm.push(int(_cells(vm, a, n).max()))
+    else:
+        vm.push(max(vm.heap[a:a+n]))
+
+def v_sort(vm):
+    n = vm.pop(); a = vm.pop()
+    _check(vm, "VSORT", a, n)
+    if _shared(vm):
+        _cells(vm, a, n).sort()
+    else:
+        _put(vm, a, sorted(vm.heap[a:a+n]))
+
+
+def install(vm):
+    vm.add_fn("V+", v_add)
+    vm.add_fn("V*", v_mul)
+    vm.add_fn("VSCALE", v_scale)
+    vm.add_fn("VSUM", v_sum)
+    vm.add_fn("VDOT", v_dot)
+    vm.add_fn("VMAX", v_max)
+    vm.add_fn("VSORT", v_sort)
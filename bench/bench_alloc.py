@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# bench_alloc.py
+# Transient memory allocated per colon-word call, per engine.
+#
+#   python3 bench/bench_alloc.py
+#
+# For each word the peak traced memory above the steady state is sampled
+# around a single call (tracemalloc), then the call is timed in a loop.
+# BASELINE is the same measurement of the VM before this work (the
+# original tuple engine, which sliced each thread out of the heap per
+# call), CPython 3.11; every engine is compared against it.
+#
+# What is left is not zero: CPython allocates an int for every ip and end
+# above 256 (heap addresses are), the tuple engine's frames list gets a
+# buffer on the first call of a word from its thread, and DOES> words
+# (KS: CONSTANT is CREATE ... DOES>) now run as a nested thread, so KS
+# peaks higher than the old per-word closure did (but runs faster). The
+# peak no longer grows with the length of the word (W200).
+
+import os, sys, time, tracemalloc
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from forth_vm import ForthVM, ENGINES
+
+SETUP = [
+    ": W20 1 2 + 3 + 4 + 5 + 6 + 7 + 8 + 9 + 10 + DROP ;",   # 20 ops
+    ": W200 " + "1 2 + DROP " * 50 + ";",                       # 200 ops
+    ": NESTED W20 W20 W20 W20 ;",
+    "99 CONSTANT K",
+    ": KS K K K K DROP DROP DROP DROP ;",                       # DOES> words
+]
+WORDS = ["W20", "W200", "NESTED", "KS"]
+CALLS = 20000
+
+# bytes/call of the original VM (tuple engine, before the engines were
+# reworked); timings vary too much between machines to pin down here
+BASELINE = {"W20": 224, "W200": 1664, "NESTED": 288, "KS": 200}
+
+
+def transient_bytes(vm, w):
+    vm.execute(w); vm.S.clear()            # warm caches
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    vm.execute(w)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    vm.S.clear()
+    return peak - base
+
+
+def per_call_us(vm, w):
+    t = time.perf_counter()
+    for _ in range(CALLS):
+        vm.execute(w)
+        if len(vm.S) > 64: vm.S.clear()
+    return (time.perf_counter() - t) / CALLS * 1e6
+
+
+def main():
+    print(f"{'engine':8} {'word':8} {'bytes/call':>10} {'baseline':>8} {'change':>7}"
+          f" {'us/call':>8}")
+    for engine in ENGINES:
+        vm = ForthVM(engine=engine)
+        for line in SETUP:
+            vm.interpret(line)
+        for name in WORDS:
+            w = vm._find_word(name)
+            n = transient_bytes(vm, w)
+            base = BASELINE[name]
+            print(f"{engine:8} {name:8} {n:>10} {base:>8} {n - base:>+7}"
+                  f" {per_call_us(vm, w):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# bench_boot.py
+# ForthVM construction time and memory, cold (kernel and high-level words
+# built from source) vs from the cached kernel template.
+#
+#   python3 bench/bench_boot.py
+
+import os, sys, time, tracemalloc
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import forth_vm
+from forth_vm import ForthVM
+
+N = 200
+
+
+def construct_us(kw, cold):
+    t = time.perf_counter()
+    for _ in range(N):
+        if cold: forth_vm._templates.clear()
+        ForthVM(**kw)
+    return (time.perf_counter() - t) / N * 1e6
+
+
+def retained_bytes(kw, cold):
+    # Memory held by one live VM (its heap included)
+    if cold: forth_vm._templates.clear()
+    else: ForthVM(**kw)
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    vm = ForthVM(**kw)
+    size = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del vm
+    return size
+
+
+def main():
+    print(f"{'options':34} {'cold us':>10} {'template us':>12} {'cold KB':>9} {'template KB':>12}")
+    for kw in ({}, {"heap": "typed"}, {"optimize": True},
+               {"heap_size": 4096}, {"heap": "typed", "heap_size": 4096}):
+        cold, warm = construct_us(kw, True), construct_us(kw, False)
+        mc, mw = retained_bytes(kw, True), retained_bytes(kw, False)
+        print(f"{str(kw):34} {cold:10.1f} {warm:12.1f} {mc/1024:9.1f} {mw/1024:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# bench_events.py
+# ON-PIN-CHANGE / EVERY on fake_machine: handler latency (edge written by
+# a driver thread -> handler running in the VM) while the VM runs a loop
+# with PAUSE or sits in MS, timer ticks handled vs fired, and events
+# dropped when a burst outruns the ring.
+#
+#   python3 bench/bench_events.py
+
+import os, sys, threading, time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import fake_machine
+fake_machine.install()
+from forth_vm import ForthVM
+import pin_ext
+
+EDGES = 300
+GAP = 0.001         # seconds between driven edges
+
+sent = []
+got = []
+
+
+def stamp(vm):
+    vm.pop()
+    got.append(time.perf_counter())
+
+
+def drive(pin, n, gap):
+    for i in range(n):
+        time.sleep(gap)
+        sent.append(time.perf_counter())
+        pin.value(i & 1 ^ 1)
+
+
+def latency(vm, busy):
+    global driver
+    del sent[:]; del got[:]
+    pin = pin_ext.pin_objects[7]
+    dropped = vm.events.dropped
+    driver = threading.Thread(target=drive, args=(pin, EDGES, GAP))
+    driver.start()
+    vm.interpret(busy)
+    driver.join()
+    vm.interpret("PAUSE")           # run what's left
+    lat = sorted((g - s) * 1e6 for s, g in zip(sent, got))
+    return lat, vm.events.dropped - dropped
+
+
+def report(name, result):
+    lat, dropped = result
+    p = lambda q: lat[min(len(lat) - 1, int(q * len(lat)))]
+    print(f"{name:28} {len(lat):6} {p(0.5):9.0f} {p(0.99):9.0f} {lat[-1]:9.0f} {dropped:8}")
+
+
+def main():
+    # The driver and timer threads stand in for IRQs; they need the GIL
+    # back sooner than CPython's default 5 ms to do that
+    sys.setswitchinterval(0.0002)
+    vm = ForthVM(engine="native")
+    pin_ext.install_pin_ext(vm)
+    vm.add_fn("STAMP", stamp)
+    vm.add_fn("DRIVING?", lambda vm: vm.push(-1 if driver.is_alive() else 0))
+    vm.interpret("0 7 /PIN  ' STAMP 7 ON-PIN-CHANGE")
+    vm.interpret(": WORK BEGIN 200 0 DO I DROP LOOP PAUSE DRIVING? NOT UNTIL ;")
+    secs = int(EDGES * GAP * 1500)
+    print(f"{'case':28} {'events':>6} {'p50 us':>9} {'p99 us':>9} {'max us':>9} {'dropped':>8}")
+    report("loop with PAUSE", latency(vm, "WORK"))
+    report(f"{secs} MS", latency(vm, f"{secs} MS"))
+    vm.event_poll = 0.0002
+    report(f"{secs} MS, 0.2 ms poll", latency(vm, f"{secs} MS"))
+
+    # Timer ticks while sleeping
+    ev = vm.events
+    dropped = ev.dropped
+    vm.interpret("VARIABLE N  : TICK N ! ;  ' TICK 1 EVERY")
+    timer = vm.timers[-1]
+    vm.interpret("500 MS TIMERS-OFF N @")
+    print(f"EVERY 1 ms over 500 MS: {timer.fired} fired, {vm.pop()} handled, "
+          f"{ev.dropped - dropped} dropped")
+
+    # A burst while a long primitive runs (nothing drains)
+    for size in (64, 1024):
+        vm.events = None
+        ring = vm.enable_events(size)
+        vm.interpret("' STAMP 7 ON-PIN-CHANGE")
+        pin = pin_ext.pin_objects[7]
+        for i in range(500):
+            pin.value(i & 1 ^ 1)
+        vm.interpret("PAUSE")
+        print(f"burst of 500 edges, ring {size:5}: {ring.dropped} dropped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# bench_i2c.py
+# A 14-byte IMU burst and an 8-register config write on fake_machine's I2C:
+# one register per word (I2C@ / I2C!) vs block words (I2C-READ-INTO /
+# I2C-WRITE-FROM) vs the transaction queue (I2C-Q@ / I2C-Q! + I2C-FLUSH).
+#
+#   python3 bench/bench_i2c.py
+
+import os, sys, time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import fake_machine
+fake_machine.install()
+from forth_vm import ForthVM
+import I2CExt, MemExt
+
+REPS = 2000
+IMU = 104       # device address
+SETUP = f"""
+0 5 4 400000 /I2C
+CREATE FRAME 14 ALLOT  CREATE CFG 8 ALLOT  CFG 8 3 FILL
+: BURST-BYTES 14 0 DO 59 I + {IMU} 0 I2C@ FRAME I + ! LOOP ;
+: BURST-QUEUE 14 0 DO FRAME I + 59 I + {IMU} 0 I2C-Q@ LOOP I2C-FLUSH ;
+: CFG-BYTES 8 0 DO CFG I + @ 16 I + {IMU} 0 I2C! LOOP ;
+: CFG-QUEUE 8 0 DO CFG I + @ 16 I + {IMU} 0 I2C-Q! LOOP I2C-FLUSH ;
+"""
+
+CASES = [
+    ("read 14 x I2C@",     "BURST-BYTES"),
+    ("read I2C-READ-INTO", f"FRAME 14 59 {IMU} 0 I2C-READ-INTO"),
+    ("read queued",        "BURST-QUEUE"),
+    ("write 8 x I2C!",     "CFG-BYTES"),
+    ("write I2C-WRITE-FROM", f"CFG 8 16 {IMU} 0 I2C-WRITE-FROM"),
+    ("write queued",       "CFG-QUEUE"),
+]
+
+
+def main():
+    print(f"{REPS} reps")
+    print(f"{'options':24} {'case':22} {'us':>8} {'transactions':>13}")
+    for kw in ({}, {"heap": "typed"}, {"engine": "native"}):
+        vm = ForthVM(**kw)
+        I2CExt.install(vm)
+        MemExt.install(vm)
+        vm.interpret(SETUP)
+        bus = vm.i2c_buses[0]
+        for name, line in CASES:
+            h = vm.prepare(line)
+            vm.run(h)
+            n0 = bus.transactions
+            t = time.perf_counter()
+            for _ in range(REPS):
+                vm.run(h)
+            dt = (time.perf_counter() - t) / REPS
+            print(f"{str(kw):24} {name:22} {dt * 1e6:8.1f} {(bus.transactions - n0) // REPS:13}")
+
+
+if __name__ == "__main__":
+    main()
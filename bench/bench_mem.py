@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# bench_mem.py
+# Block memory words (MOVE, CMOVE, FILL, ERASE) against the DO/LOOP code
+# they replace, on a 1K-cell buffer, for each heap mode and engine.
+#
+#   python3 bench/bench_mem.py
+
+import os, sys, time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from forth_vm import ForthVM
+import MemExt
+
+SIZE = 1024
+REPS = 200
+
+SETUP = f"""
+CREATE SRC {SIZE} ALLOT  CREATE DST {SIZE} ALLOT
+: LMOVE ( src dst u -- ) 0 DO OVER I + @ OVER I + ! LOOP 2DROP ;
+: LFILL ( addr u c -- ) SWAP 0 DO 2DUP SWAP I + ! LOOP 2DROP ;
+"""
+
+CASES = [
+    ("copy",  f"SRC DST {SIZE} MOVE",     f"SRC DST {SIZE} LMOVE"),
+    ("cmove", f"SRC DST {SIZE} CMOVE",    f"SRC DST {SIZE} LMOVE"),
+    ("fill",  f"DST {SIZE} 7 FILL",       f"DST {SIZE} 7 LFILL"),
+    ("erase", f"DST {SIZE} ERASE",        f"DST {SIZE} 0 LFILL"),
+]
+
+
+def per_call_us(vm, line):
+    h = vm.prepare(line)
+    vm.run(h)
+    t = time.perf_counter()
+    for _ in range(REPS):
+        vm.run(h)
+    return (time.perf_counter() - t) / REPS * 1e6
+
+
+def main():
+    print(f"{SIZE} cells, {REPS} reps")
+    print(f"{'options':36} {'case':6} {'word us':>9} {'loop us':>10} {'x':>7}")
+    for kw in ({}, {"heap": "typed"}, {"engine": "closure"}, {"engine": "native"}):
+        vm = ForthVM(**kw)
+        MemExt.install(vm)
+        vm.interpret(SETUP)
+        for name, word, loop in CASES:
+            a, b = per_call_us(vm, word), per_call_us(vm, loop)
+            print(f"{str(kw):36} {name:6} {a:9.1f} {b:10.1f} {b / a:7.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# bench_par.py
+# PAR-MAP scaling: a pure CPU-bound word over N inputs, serial in the
+# parent vs forth_par.ParPool with 1, 2, 4 ... workers (pool start-up,
+# image save/load included, timed apart).
+#
+#   python3 bench/bench_par.py [N] [max_workers]
+
+import os, sys, time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from forth_vm import ForthVM
+from forth_par import ParPool
+
+WORK = ": WORK ( n -- sum ) 0 SWAP 0 DO I + LOOP ;"
+SPAN = 2000     # loop turns per input
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    top = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    vm = ForthVM(engine="native")
+    vm.interpret(WORK)
+    inputs = [SPAN] * n
+
+    h = vm.prepare("WORK")
+    t = time.perf_counter()
+    serial = [vm.run(h, x) for x in inputs]
+    base = time.perf_counter() - t
+    print(f"cores: {os.cpu_count()}  inputs: {n}")
+    print(f"{'workers':>8} {'start s':>9} {'map s':>9} {'speedup':>8}")
+    print(f"{'serial':>8} {'':>9} {base:9.3f} {1.0:8.2f}")
+
+    p = 1
+    while p <= top:
+        t = time.perf_counter()
+        with ParPool(vm, processes=p) as pool:
+            pool.map("WORK", inputs[:p])        # wait for every worker to boot
+            start = time.perf_counter() - t
+            t = time.perf_counter()
+            out = pool.map("WORK", inputs)
+            took = time.perf_counter() - t
+        assert out == serial
+        print(f"{p:8} {start:9.3f} {took:9.3f} {base / took:8.2f}")
+        p *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# bench_pin.py
+# Achievable GPIO toggle rate on fake_machine's Pin (timestamps from
+# Pin.log): PIN! in a DO/LOOP vs a PIN: handle word vs PIN-SEQ, plus the
+# timing error of a 100 us PIN-SEQ square wave.
+#
+#   python3 bench/bench_pin.py
+
+import os, sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import fake_machine
+fake_machine.install()
+from fake_machine import Pin
+from forth_vm import ForthVM
+import pin_ext
+
+N = 5000        # toggles per case
+
+SETUP = f"""
+1 5 /PIN  5 PIN: LED
+: BANG-PIN!   {N // 2} 0 DO 1 5 PIN! 0 5 PIN! LOOP ;
+: BANG-HANDLE {N // 2} 0 DO 1 LED 0 LED LOOP ;
+CREATE FAST {N * 3} ALLOT  CREATE SLOW 300 ALLOT
+: STEPS ( addr n delay -- ) SWAP 0 DO OVER I 3 * + >R 5 R@ ! I 2 / 2 * I = NEGATE R@ 1 + ! DUP R> 2 + ! LOOP 2DROP ;
+FAST {N} 0 STEPS  SLOW 100 100 STEPS
+"""
+
+
+def rate(vm, line):
+    Pin.log.clear()
+    vm.interpret(line)
+    ts = [t for t, _, _ in Pin.log]
+    return (len(ts) - 1) / ((ts[-1] - ts[0]) / 1e9), ts
+
+
+def main():
+    print(f"{'options':24} {'case':12} {'toggles/s':>12}")
+    for kw in ({}, {"engine": "native"}):
+        vm = ForthVM(**kw)
+        pin_ext.install_pin_ext(vm)
+        vm.interpret(SETUP)
+        for name, line in (("PIN!", "BANG-PIN!"), ("handle", "BANG-HANDLE"),
+                           ("PIN-SEQ", f"FAST {N} PIN-SEQ")):
+            print(f"{str(kw):24} {name:12} {rate(vm, line)[0]:12.0f}")
+    _, ts = rate(vm, "SLOW 100 PIN-SEQ")
+    gaps = [(b - a) / 1000 for a, b in zip(ts, ts[1:])]
+    print(f"100 us steps: mean {sum(gaps) / len(gaps):.1f} us, "
+          f"min {min(gaps):.1f} us, max {max(gaps):.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# bench_spi.py
+# SPI throughput on fake_machine's loopback bus: a 4 KB frame sent and
+# received through the stack (SPI! / SPI@) vs straight from/to heap
+# buffers (SPI-WRITE-FROM / SPI-READ-INTO / SPI-XFER).
+#
+#   python3 bench/bench_spi.py
+
+import os, sys, time
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+import fake_machine
+fake_machine.install()
+from forth_vm import ForthVM
+import SPIExt, MemExt
+
+FRAME = 4096
+REPS = 200
+
+SETUP = f"""
+1 10 11 12 8000000 /SPI
+CREATE TX {FRAME} ALLOT  CREATE RX {FRAME} ALLOT  TX {FRAME} 85 FILL
+: PUSH-FRAME ( -- b0 .. bn ) TX {FRAME} 0 DO DUP I + @ SWAP LOOP DROP ;
+: DROP-FRAME ( b0 .. bn -- ) {FRAME} 0 DO DROP LOOP ;
+"""
+
+CASES = [
+    ("write via stack", "PUSH-FRAME {n} 1 SPI!"),
+    ("write from heap", "TX {n} 1 SPI-WRITE-FROM"),
+    ("read via stack",  "{n} 1 SPI@ DROP-FRAME"),
+    ("read into heap",  "RX {n} 1 SPI-READ-INTO"),
+    ("full duplex",     "TX RX {n} 1 SPI-XFER"),
+]
+
+
+def main():
+    print(f"{FRAME} byte frame, {REPS} reps")
+    print(f"{'options':24} {'case':16} {'us/frame':>10} {'MB/s':>8}")
+    for kw in ({}, {"heap": "typed"}, {"engine": "native"}):
+        vm = ForthVM(**kw)
+        SPIExt.install(vm)
+        MemExt.install(vm)
+        vm.interpret(SETUP)
+        for name, line in CASES:
+            h = vm.prepare(line.format(n=FRAME))
+            vm.run(h)
+            t = time.perf_counter()
+            for _ in range(REPS):
+                vm.run(h)
+            dt = (time.perf_counter() - t) / REPS
+            print(f"{str(kw):24} {name:16} {dt * 1e6:10.1f} {FRAME / dt / 1e6:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
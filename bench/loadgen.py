@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# loadgen.py
+# N concurrent clients against pf_server: commands/sec and latency.
+#
+#   python3 bench/loadgen.py [clients] [commands per client] [host:port]
+#
+# Without host:port a server on a free local port is started in-process.
+# Each command is sent as one line and timed until the next "ok> " prompt.
+
+import os, socket, sys, threading, time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+COMMANDS = [
+    "1 2 + .",
+    ": SQ DUP * ;",
+    "7 SQ .",
+    "0 100 0 DO I + LOOP .",
+    "HEX FF DECIMAL .",
+]
+
+
+def read_prompt(sock, pending):
+    while not pending.endswith(b"ok> "):
+        chunk = sock.recv(4096)
+        if not chunk: raise OSError("server closed the connection")
+        pending += chunk
+    return b""
+
+
+def client(addr, n, lat):
+    sock = socket.create_connection(addr)
+    read_prompt(sock, b"")
+    for i in range(n):
+        t = time.perf_counter()
+        sock.sendall((COMMANDS[i % len(COMMANDS)] + "\n").encode())
+        read_prompt(sock, b"")
+        lat.append(time.perf_counter() - t)
+    sock.sendall(b"BYE\n")
+    sock.close()
+
+
+def start_server():
+    from forth_vm import ForthVM
+    from pf_server import Server
+    server = Server(ForthVM(), port=0)
+    t = threading.Thread(target=server.serve_forever)
+    t.daemon = True
+    t.start()
+    return ("127.0.0.1", server.port)
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    if len(sys.argv) > 3:
+        host, port = sys.argv[3].rsplit(":", 1)
+        addr = (host, int(port))
+    else:
+        addr = start_server()
+    lats = [[] for _ in range(clients)]
+    threads = [threading.Thread(target=client, args=(addr, n, lats[i])) for i in range(clients)]
+    t = time.perf_counter()
+    for th in threads: th.start()
+    for th in threads: th.join()
+    elapsed = time.perf_counter() - t
+    lat = sorted(x for l in lats for x in l)
+    p = lambda q: lat[min(len(lat) - 1, int(q * len(lat)))] * 1e3
+    print(f"{clients} clients x {n} commands: {len(lat)/elapsed:.0f} cmd/s, "
+          f"p50 {p(0.50):.2f} ms, p99 {p(0.99):.2f} ms, max {lat[-1]*1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
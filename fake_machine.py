@@ -0,0 +1,209 @@
+# fake_machine.py
+# Pure-Python stand-in for MicroPython's machine module, so the hardware
+# extensions load and can be benchmarked on a desktop:
+#
+#   import fake_machine; fake_machine.install()     # before PYTHON SPIExt.py
+#
+# SPI is a loopback (MISO wired to MOSI): write_readinto reads back what it
+# sends, read/readinto return the bytes of the last write, repeated (or the
+# write byte if nothing was written yet). I2C devices are 256-byte register
+# files that auto-increment; the bus counts transactions. Every bus counts
+# bytes moved. Pin writes are logged with a timestamp in Pin.log and fire
+# Pin.irq handlers on edges. Timer callbacks all run on one thread.
+
+import heapq, sys, threading, time
+from collections import deque
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    # (perf_counter_ns, pin id, level) of every write, newest last
+    log = deque(maxlen=1 << 16)
+
+    def __init__(self, id, mode=-1, pull=None, value=None):
+        self.id = id
+        self.mode = mode
+        self.pull = pull
+        self._value = value or 0
+        self._irq = None        # (handler, trigger)
+
+    def init(self, mode=-1, pull=None, value=None):
+        self.mode = mode
+        if pull is not None: self.pull = pull
+        if value is not None: self.value(value)
+
+    def value(self, v=None):
+        if v is None: return self._value
+        old = self._value
+        self._value = 1 if v else 0
+        self.log.append((time.perf_counter_ns(), self.id, self._value))
+        # Edges fire the IRQ handler in the writing thread (tests drive
+        # input pins with value() too)
+        irq = self._irq
+        if irq is not None and old != self._value:
+            if irq[1] & (self.IRQ_RISING if self._value else self.IRQ_FALLING):
+                irq[0](self)
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING):
+        self._irq = None if handler is None else (handler, trigger)
+
+    def on(self): self.value(1)
+    def off(self): self.value(0)
+
+
+class SPI:
+    MSB = 0
+    LSB = 1
+
+    def __init__(self, id, baudrate=1000000, polarity=0, phase=0, bits=8,
+                 firstbit=MSB, sck=None, mosi=None, miso=None):
+        self.id = id
+        self.baudrate = baudrate
+        self.last = b""         # bytes of the last write (the loopback)
+        self.written = 0        # bytes sent
+        self.received = 0       # bytes read
+
+    def write(self, buf):
+        self.last = bytes(buf)
+        self.written += len(buf)
+
+    def readinto(self, buf, write=0x00):
+        n = len(buf)
+        src = self.last or bytes([write])
+        while len(src) < n:
+            src = src * 2
+        buf[:] = src[:n]
+        self.received += n
+
+    def read(self, nbytes, write=0x00):
+        buf = bytearray(nbytes)
+        self.readinto(buf, write)
+        return bytes(buf)
+
+    def write_readinto(self, write_buf, read_buf):
+        read_buf[:] = write_buf
+        self.last = bytes(write_buf)
+        self.written += len(write_buf)
+        self.received += len(read_buf)
+
+
+class I2C:
+    def __init__(self, id, scl=None, sda=None, freq=400000):
+        self.id = id
+        self.freq = freq
+        self.devices = {}       # address -> bytearray(256) of registers
+        self.transactions = 0
+        self.written = 0
+        self.received = 0
+
+    def regs(self, addr):
+        r = self.devices.get(addr)
+        if r is None:
+            r = self.devices[addr] = bytearray(256)
+        return r
+
+    def scan(self):
+        return sorted(self.devices)
+
+    def readfrom_mem_into(self, addr, memaddr, buf):
+        r = self.regs(addr)
+        for i in range(len(buf)):
+            buf[i] = r[(memaddr + i) & 0xFF]
+        self.transactions += 1
+        self.received += len(buf)
+
+    def readfrom_mem(self, addr, memaddr, nbytes):
+        buf = bytearray(nbytes)
+        self.readfrom_mem_into(addr, memaddr, buf)
+        return bytes(buf)
+
+    def writeto_mem(self, addr, memaddr, buf):
+        r = self.regs(addr)
+        for i, b in enumerate(bytes(buf)):
+            r[(memaddr + i) & 0xFF] = b
+        self.transactions += 1
+        self.written += len(buf)
+
+    def writeto(self, addr, buf, stop=True):
+        # first byte sets the register pointer, the rest are written from it
+        buf = bytes(buf)
+        if buf:
+            self.writeto_mem(addr, buf[0], buf[1:])
+        else:
+            self.transactions += 1
+        self.written += min(len(buf), 1)
+
+    def readfrom_into(self, addr, buf, stop=True):
+        self.readfrom_mem_into(addr, 0, buf)
+
+
+class Timer:
+    # Every Timer callback runs on one shared thread, like IRQs on a board
+    # (so an EventRing gets a single producer)
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    _queue = []             # heap of (due, seq, timer, generation)
+    _cond = threading.Condition()
+    _thread = None
+    _seq = 0
+
+    def __init__(self, id=-1, **kw):
+        self.id = id
+        self.callback = None
+        self.fired = 0
+        self._gen = 0           # bumped by init/deinit: older queue entries are stale
+        if kw: self.init(**kw)
+
+    def init(self, mode=PERIODIC, period=-1, callback=None, freq=None):
+        if freq: period = 1000 / freq
+        self.deinit()
+        self.mode = mode
+        self.period = period / 1000
+        self.callback = callback
+        self._add(time.monotonic() + self.period)
+
+    def deinit(self):
+        self.callback = None
+        self._gen += 1
+
+    def _add(self, due):
+        cls = Timer
+        with cls._cond:
+            cls._seq += 1
+            heapq.heappush(cls._queue, (due, cls._seq, self, self._gen))
+            if cls._thread is None:
+                cls._thread = threading.Thread(target=cls._run)
+                cls._thread.daemon = True
+                cls._thread.start()
+            cls._cond.notify()
+
+    @classmethod
+    def _run(cls):
+        while True:
+            with cls._cond:
+                while not cls._queue:
+                    cls._cond.wait()
+                due, _, t, gen = cls._queue[0]
+                wait = due - time.monotonic()
+                if wait > 0:
+                    cls._cond.wait(wait)
+                    continue
+                heapq.heappop(cls._queue)
+            cb = t.callback
+            if cb is None or gen != t._gen: continue
+            t.fired += 1
+            if t.mode == cls.PERIODIC:
+                t._add(due + t.period)
+            cb(t)
+
+
+def install():
+    """Make import machine find this module."""
+    sys.modules["machine"] = sys.modules[__name__]
@@ -0,0 +1,185 @@
+# forth_image.py
+# Dictionary images for SAVE-IMAGE / LOAD-IMAGE (vm.save_image / vm.load_image).
+#
+# An image holds the heap cells below HERE (and, for heap="typed", the code
+# table and thread ops), HERE, LATEST, BASE, the files run by PYTHON and
+# the names of the TASKs (a loaded image has them all idle).
+# Every cell is written as a one-byte tag and its payload:
+#
+#   I int (zigzag varint)   N None   S str   T tuple (count, items)
+#   P primitive, by its add_fn key   M op from vm.make_op (kind, args)
+#
+# Functions are never pickled: the loading VM must have the same primitives
+# and op factories installed (same kernel, same extensions installed from
+# Python). LOAD-IMAGE re-runs the recorded PYTHON files first so their
+# primitives are registered, then swaps the whole dictionary in.
+
+from array import array
+from forth_vm import TYPED_CELL, Task
+
+MAGIC = b"PFI1"
+
+
+class _Writer:
+    def __init__(self, vm):
+        self.vm = vm
+        self.buf = bytearray(MAGIC)
+
+    def uint(self, n):
+        buf = self.buf
+        while n > 0x7F:
+            buf.append((n & 0x7F) | 0x80); n >>= 7
+        buf.append(n)
+
+    def text(self, s):
+        b = s.encode(); self.uint(len(b)); self.buf.extend(b)
+
+    def value(self, v):
+        buf = self.buf
+        if v is None:
+            buf.append(78)                                  # N
+        elif isinstance(v, int):
+            buf.append(73)                                  # I
+            self.uint(v << 1 if v >= 0 else ((-v) << 1) - 1)
+        elif isinstance(v, str):
+            buf.append(83); self.text(v)                    # S
+        elif isinstance(v, tuple):
+            buf.append(84); self.uint(len(v))               # T
+            for x in v: self.value(x)
+        elif callable(v):
+            vm = self.vm
+            key = vm._prim_keys.get(id(v))
+            if key is not None:
+                buf.append(80); self.text(key)              # P
+                return
+            recipe = getattr(v, "recipe", None)
+            if recipe is None:
+                raise RuntimeError(f"Can't save {v!r}: not added with add_fn or make_op")
+            buf.append(77); self.text(recipe[0]); self.value(recipe[1])   # M
+        else:
+            raise RuntimeError(f"Can't save {v!r} in an image")
+
+
+class _Reader:
+    def __init__(self, vm, data):
+        self.vm = vm
+        self.data = data
+        self.pos = len(MAGIC)
+
+    def uint(self):
+        data = self.data; n = 0; shift = 0
+        while True:
+            b = data[self.pos]; self.pos += 1
+            n |= (b & 0x7F) << shift
+            if b < 0x80: return n
+            shift += 7
+
+    def text(self):
+        n = self.uint(); p = self.pos
+        self.pos = p + n
+        return bytes(self.data[p:p+n]).decode()
+
+    def value(self):
+        tag = self.data[self.pos]; self.pos += 1
+        if tag == 73:
+            n = self.uint()
+            return -(n >> 1) - 1 if n & 1 else n >> 1
+        if tag == 78:
+            return None
+        if tag == 83:
+            return self.text()
+        if tag == 84:
+            return tuple(self.value() for _ in range(self.uint()))
+        vm = self.vm
+        if tag == 80:
+            key = self.text()
+            fn = vm._prims.get(key)
+            if fn is None:
+                raise RuntimeError(f"Image needs primitive {key}")
+            return fn
+        if tag == 77:
+            kind = self.text(); args = self.value()
+            if kind not in vm._factories:
+                raise RuntimeError(f"Image needs op factory {kind}")
+            return vm.make_op(kind, *args)
+        raise RuntimeError(f"Bad image tag {tag}")
+
+
+def save_image(vm, path):
+    if vm.compiling:
+        raise RuntimeError("SAVE-IMAGE while compiling")
+    typed = vm.typed_heap
+    w = _Writer(vm)
+    w.value(("typed" if typed else "list", vm.here, vm.latest, vm.base,
+             vm.fence, vm._kernel_end, tuple(vm.py_files),
+             tuple(t.name for t in vm.tasks)))
+    heap = vm.heap
+    w.uint(vm.here)
+    for a in range(vm.here):
+        w.value(heap[a])
+    if typed:
+        w.uint(len(vm.code))
+        for cf, code in vm.code.items():
+            w.uint(cf); w.value(code)
+        w.uint(len(vm.ops))
+        for op in vm.ops:
+            w.value(op)
+    with open(path, "wb") as f:
+        f.write(w.buf)
+
+
+def load_image(vm, path):
+    if vm.compiling:
+        raise RuntimeError("LOAD-IMAGE while compiling")
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise RuntimeError(f"{path} is not a PyForth image")
+    r = _Reader(vm, data)
+    mode, here, latest, base, fence, kernel_end, py_files, *tasks = r.value()
+    typed = vm.typed_heap
+    if mode != ("typed" if typed else "list"):
+        raise RuntimeError(f"{path} is a {mode} heap image")
+
+    # Register the primitives of PYTHON-loaded files (their headers land
+    # in the dictionary that's about to be replaced)
+    for fname in dict.fromkeys(py_files):      # once each (older images repeat them)
+        with open(fname, "r") as f:
+            src = f.read()
+        ns = {"vm": vm}
+        exec(src, ns)
+        if "install" in ns and callable(ns["install"]):
+            ns["install"](vm)
+
+    cells = [r.value() for _ in range(r.uint())]
+    size = max(len(vm.heap), here)
+    if typed:
+        heap = array(TYPED_CELL, cells)
+        heap.extend(array(TYPED_CELL, [0]) * (size - here))
+        code = {}
+        for _ in range(r.uint()):
+            cf = r.uint(); code[cf] = r.value()
+        ops = [r.value() for _ in range(r.uint())]
+    else:
+        heap = cells
+        heap.extend([0] * (size - here))
+        code = ops = heap
+
+    vm.heap = heap; vm.code = code; vm.ops = ops
+    vm.here = here; vm.latest = latest; vm.base = base
+    vm.fence = fence; vm._kernel_end = kernel_end
+    vm.py_files = list(py_files)
+    # A TASK word pushes its index into vm.tasks: same tasks, same order
+    # (older images didn't record them)
+    vm.tasks = [Task(name) for name in (tasks[0] if tasks else ())]
+    vm.runtime_created_header = None
+    # Name index from the header chain, oldest definition first
+    index = {}
+    p = latest
+    while p:
+        index.setdefault(vm._word_name(p).upper(), []).insert(0, p)
+        p = heap[p]
+    vm._index = index
+    vm._closures.clear(); vm._native.clear()
+    vm._line_cache.clear(); vm._resolved.clear()
+    vm._note_cut(0)
@@ -0,0 +1,249 @@
+# forth_native.py
+# Forth -> Python code generator for the "native" engine.
+#
+# A finished colon thread is turned into Python source and built with
+# compile(), so CPython's own bytecode loop runs the word. BRANCH/0BRANCH
+# index jumps are rebuilt into structured if/else and while loops:
+#
+#   0BRANCH fwd X            -> if S.pop(): ...           (IF ... THEN)
+#   0BRANCH fwd X, BRANCH Y  -> if S.pop(): ... else: ... (IF ... ELSE ... THEN)
+#   ... BRANCH back B        -> while True: ...           (AGAIN, REPEAT, LOOP)
+#   ... 0BRANCH back B       -> while True: ... if S.pop(): break   (UNTIL)
+#   DO ... LOOP / +LOOP      -> while True: ... with the step/test at the end
+#   jump to loop end / head  -> break / continue          (WHILE, LEAVE)
+#
+# Anything else (DOES> defining words, inline <P Python, ACTIVATE, jumps
+# that don't nest) returns None and the VM keeps running that word on its
+# thread engine. PAUSE/MS here run the other tasks in place: only the
+# tuple engine suspends a task.
+#
+# Inlined stack ops index S directly, so an empty stack shows up as an
+# IndexError; the VM asks stack_fault() whether to report it as the other
+# engines do ("Stack underflow").
+
+# Kernel primitives expanded in place instead of called
+INLINE = {
+    "+":    "t = S.pop(); S[-1] += t",
+    "-":    "t = S.pop(); S[-1] -= t",
+    "*":    "t = S.pop(); S[-1] *= t",
+    "/":    "t = S.pop(); S[-1] //= t",
+    "=":    "t = S.pop(); S[-1] = -1 if S[-1] == t else 0",
+    "<":    "t = S.pop(); S[-1] = -1 if S[-1] < t else 0",
+    ">":    "t = S.pop(); S[-1] = -1 if S[-1] > t else 0",
+    "DUP":  "S.append(S[-1])",
+    "DROP": "S.pop()",
+    "SWAP": "S[-1], S[-2] = S[-2], S[-1]",
+    "OVER": "S.append(S[-2])",
+    ">R":   "R.append(S.pop())",
+    "R>":   "S.append(R.pop())",
+    "R@":   "S.append(R[-1])",
+    "I":    "S.append(R[-1])",
+    "J":    "S.append(R[-3])",
+    "@":    "S[-1] = heap[S[-1]]",
+    "!":    "t = S.pop(); heap[t] = S.pop()",
+}
+
+# Optimizer superinstructions (callable ops) by function name
+INLINE_OPS = {
+    "_op_2dup": "S.append(S[-2]); S.append(S[-2])",
+    "_op_nip":  "del S[-2]",
+}
+
+# Conditional jumps: tag -> (test to fall through, test to jump)
+COND = {
+    "0BRANCH":       ("S.pop()", "not S.pop()"),
+    "DUPNOT0BRANCH": ("not S[-1]", "S[-1]"),
+}
+
+# Loop closers: tag -> lines ending the while body (index/limit stay on R)
+CLOSE = {
+    "LOOP":  ["R[-1] += 1",
+              "if R[-1] >= R[-2]: del R[-2:]; break"],
+    "+LOOP": ["t = S.pop(); R[-1] += t",
+              "if (R[-1] >= R[-2]) if t >= 0 else (R[-1] < R[-2]): del R[-2:]; break"],
+}
+
+# Callable ops that must stay on the thread engine
+FALLBACK_OPS = ("_install_does", "_run_python")
+
+
+class Unsupported(Exception):
+    pass
+
+
+def compile_thread(vm, start, count):
+    """Return a function fn(vm) running ops[start:start+count], or None."""
+    try:
+        src, ns = generate(vm, start, count)
+        exec(compile(src, "<forth@%d>" % start, "exec"), ns)
+    except (Unsupported, SyntaxError, RecursionError, NameError):
+        return None
+    fn = ns["word"]
+    fn.lines = src.split("\n")
+    return fn
+
+
+def stack_fault(vm, fn, e):
+    """True if IndexError e was raised by fn's own data stack ops, not by a
+    word it called, a heap address or R (those fail the same way on every
+    engine)."""
+    tb = e.__traceback__
+    while tb.tb_next is not None:
+        tb = tb.tb_next
+    if tb.tb_frame.f_code.co_filename != fn.__code__.co_filename:
+        return False
+    line = fn.lines[tb.tb_lineno - 1]
+    if "R.pop()" in line or "R[" in line:
+        return False
+    if "heap[" in line:
+        # @ / ! inline: a bad address fails on the heap, not on S
+        msg = str(e)
+        return "pop" in msg or ("assignment" not in msg and not vm.S)
+    return True
+
+
+def generate(vm, start, count):
+    """Return (source, globals) for the thread; raises Unsupported."""
+    gen = _Gen(vm, vm.ops[start:start+count])
+    gen.block(0, gen.n, 1, None)
+    body = gen.lines or ["    pass"]
+    src = "\n".join(["def word(vm):",
+                     "    S = vm.S; R = vm.R; heap = vm.heap"] + body) + "\n"
+    return src, gen.ns
+
+
+class _Gen:
+    def __init__(self, vm, ops):
+        self.vm = vm
+        self.ops = ops
+        self.n = len(ops)
+        self.lines = []
+        # The class's _execute_cf, not vm's: a profiler swapped in while this
+        # compiles mustn't stay bound into the word after PROFILE-OFF
+        self.ns = {"call": type(vm)._execute_cf}
+        self._names = {}
+        # Loop heads: branch target -> positions of backward jumps to it
+        self.back = {}
+        for i, op in enumerate(ops):
+            if isinstance(op, tuple) and (op[0] == "BRANCH" or op[0] in COND or op[0] in CLOSE):
+                if op[1] is None:
+                    raise Unsupported("unpatched branch")
+                if op[1] <= i:
+                    self.back.setdefault(op[1], []).append(i)
+
+    def emit(self, depth, line):
+        self.lines.append("    " * depth + line)
+
+    def const(self, obj):
+        # Bind a Python object into the function's globals
+        key = id(obj)
+        if key not in self._names:
+            name = "k%d" % len(self._names)
+            self._names[key] = name
+            self.ns[name] = obj
+        return self._names[key]
+
+    def is_branch(self, i, tag="BRANCH"):
+        op = self.ops[i]
+        return isinstance(op, tuple) and op[0] == tag
+
+    def block(self, lo, hi, depth, loop):
+        # Emit ops[lo:hi]; loop is (head, end) of the innermost while loop
+        mark = len(self.lines)
+        ops = self.ops
+        i = lo
+        while i < hi:
+            closers = [p for p in self.back.get(i, ()) if p < hi]
+            if closers:
+                p = max(closers)
+                self.emit(depth, "while True:")
+                self.block(i, p, depth + 1, (i, p + 1))
+                if ops[p][0] in COND:
+                    self.emit(depth + 1, "if %s: break" % COND[ops[p][0]][0])
+                for line in CLOSE.get(ops[p][0], ()):
+                    self.emit(depth + 1, line)
+                i = p + 1
+                continue
+            op = ops[i]
+            if callable(op):
+                name = getattr(op, "__name__", "")
+                if name in FALLBACK_OPS:
+                    raise Unsupported(name)
+                self.emit(depth, INLINE_OPS.get(name) or "%s(vm)" % self.const(op))
+                i += 1
+                continue
+            if not isinstance(op, tuple):
+                raise Unsupported("bad op %r" % (op,))
+            tag = op[0]
+            if tag == "LIT":
+                n = op[1]
+                lit = repr(n) if type(n) is int else self.const(n)
+                self.emit(depth, "S.append(%s)" % lit)
+                i += 1
+            elif tag == "CALL_ADDR":
+                self.emit(depth, self.call(op[1]))
+                i += 1
+            elif tag == "LIT+":
+                self.emit(depth, "S[-1] += %r" % op[1])
+                i += 1
+            elif tag == "DO":
+                self.emit(depth, "t = S.pop(); R.append(S.pop()); R.append(t)")
+                i += 1
+            elif tag == "UNLOOP":
+                self.emit(depth, "del R[-2:]")
+                i += 1
+            elif tag == "EXIT":
+                self.emit(depth, "return")
+                i += 1
+            elif tag == "PAUSE":
+                self.emit(depth, "vm.pause()")
+                i += 1
+            elif tag == "MS":
+                self.emit(depth, "vm.pause(S.pop() / %r)" % op[1])
+                i += 1
+            elif tag == "BRANCH":
+                self.emit(depth, self.jump(op[1], loop))
+                i += 1
+            elif tag in COND:
+                t = op[1]
+                stay, go = COND[tag]
+                if i < t <= hi:
+                    # IF ... [ELSE ...] THEN
+                    self.emit(depth, "if %s:" % stay)
+                    if t - 1 > i and self.is_branch(t - 1) and t <= ops[t-1][1] <= hi:
+                        y = ops[t-1][1]
+                        self.block(i + 1, t - 1, depth + 1, loop)
+                        self.emit(depth, "else:")
+                        self.block(t, y, depth + 1, loop)
+                        i = y
+                    else:
+                        self.block(i + 1, t, depth + 1, loop)
+                        i = t
+                else:
+                    self.emit(depth, "if %s: %s" % (go, self.jump(t, loop)))
+                    i += 1
+            else:
+                raise Unsupported("tag %s" % tag)
+        if len(self.lines) == mark:
+            self.emit(depth, "pass")
+
+    def jump(self, t, loop):
+        if loop is not None and t == loop[1]:
+            return "break"
+        if loop is not None and t == loop[0]:
+            return "continue"
+        if t == self.n:
+            return "return"
+        raise Unsupported("unstructured jump to %d" % t)
+
+    def call(self, w):
+        vm = self.vm
+        cf = vm._word_fields(w)[2]
+        if w < vm._kernel_end:
+            snippet = INLINE.get(vm._word_name(w).upper())
+            if snippet is not None:
+                return snippet
+            code = vm.code[cf]
+            if callable(code):
+                return "%s(vm)" % self.const(code)
+        return "call(vm, %d)" % cf
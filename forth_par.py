@@ -0,0 +1,163 @@
+# forth_par.py
+# Parallel map over a pool of worker processes, each running its own VM
+# booted from the parent's dictionary.
+#
+#   from forth_par import ParPool, par_map
+#   par_map(vm, "SQ", range(10000))                -> [[0], [1], [4], ...]
+#   with ParPool(vm, init=install_extn) as pool:   # reuse the workers
+#       pool.map("SQ", xs); pool.map("CUBE", ys)
+#
+# Forth: xt addr n PAR-MAP ( xt addr n -- ) runs xt ( x -- y ) on each of
+# the n cells at addr and stores the results back in place.
+#
+# The parent writes a dictionary image (forth_image.py) to a temp file and
+# every worker loads it, so words defined after the pool started are not
+# seen by it (PAR-MAP starts a new pool when the dictionary has changed).
+# Primitives installed from Python must exist in the workers too: pass the
+# install function as init (a module-level function, so it can be pickled).
+# Inputs go out in chunks and results come back in input order. Only pure
+# words make sense here: heap stores and output stay in the worker.
+#
+# Needs multiprocessing, so it is not installed on boards (see Extn.py).
+
+import atexit, multiprocessing, os, tempfile
+
+from forth_vm import ForthVM
+
+_vm = None      # this worker's VM
+_boot_error = None
+_pools = []     # PAR-MAP's current pool per VM (closed at exit)
+
+
+def _boot_worker(path, heap, engine, init):
+    # A failing pool initializer makes the pool respawn workers forever,
+    # so the error is kept and raised by the first job instead
+    global _vm, _boot_error
+    try:
+        vm = ForthVM(engine=engine, heap=heap)
+        if init is not None:
+            init(vm)
+        if "PAR-MAP" not in vm._prims:
+            install(vm)         # the image has the parent's PAR-MAP header
+        vm.load_image(path)
+        _vm = vm
+    except Exception as e:
+        _boot_error = f"PAR-MAP worker boot: {e}"
+
+
+def _map_chunk(job):
+    # job: (xt, inputs); an input is one value or a tuple of values
+    w, chunk = job
+    if _boot_error is not None:
+        raise RuntimeError(_boot_error)
+    vm = _vm
+    S = vm.S
+    out = []
+    for x in chunk:
+        S.clear(); vm.R.clear()
+        if isinstance(x, tuple): S.extend(x)
+        else: S.append(x)
+        vm.execute(w)
+        out.append(list(S))
+    vm.out.flush()
+    return out
+
+
+class ParPool:
+    def __init__(self, vm, processes=None, init=None):
+        # init defaults to what forth_par.install was given
+        if init is None:
+            init = getattr(vm, "par_init", None)
+        self.vm = vm
+        self.processes = processes or os.cpu_count() or 1
+        self.version = vm._dict_version
+        fd, self.path = tempfile.mkstemp(suffix=".img")
+        os.close(fd)
+        try:
+            vm.save_image(self.path)
+            self.pool = multiprocessing.Pool(
+                self.processes, _boot_worker,
+                (self.path, "typed" if vm.typed_heap else "list",
+                 vm.engine, init))
+        except Exception:
+            os.remove(self.path)
+            raise
+
+    def xt(self, word):
+        if isinstance(word, int):
+            return word
+        w = self.vm._find_word(word.upper())
+        if w is None: raise RuntimeError(f"PAR-MAP: unknown word {word}")
+        return w
+
+    def map(self, word, inputs, chunksize=None):
+        """Run word on each input in the workers; the stack each run left,
+        in input order."""
+        w = self.xt(word)
+        inputs = list(inputs)
+        if chunksize is None:
+            # a few chunks per worker evens out uneven inputs
+            chunksize = max(1, -(-len(inputs) // (self.processes * 4)))
+        jobs = [(w, inputs[i:i+chunksize]) for i in range(0, len(inputs), chunksize)]
+        out = []
+        for part in self.pool.map(_map_chunk, jobs):
+            out.extend(part)
+        return out
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def par_map(vm, word, inputs, processes=None, init=None, chunksize=None):
+    """One-off map: start a pool, run word over inputs, shut it down."""
+    with ParPool(vm, processes, init) as pool:
+        return pool.map(word, inputs, chunksize)
+
+
+# ==================== Forth word ====================
+
+@atexit.register
+def _close_pools():
+    while _pools:
+        _pools.pop().close()
+
+
+def close(vm):
+    """Shut down the pool PAR-MAP started for vm (done at exit otherwise)."""
+    pool = vm._par_pool
+    if pool is not None:
+        vm._par_pool = None
+        _pools.remove(pool)
+        pool.close()
+
+
+def do_par_map(vm):
+    n = vm.pop(); addr = vm.pop(); w = vm.pop()
+    pool = vm._par_pool
+    if pool is None or pool.version != vm._dict_version:
+        close(vm)
+        pool = vm._par_pool = ParPool(vm, init=vm.par_init)
+        _pools.append(pool)
+    heap = vm.heap
+    for i, res in enumerate(pool.map(w, heap[addr:addr+n])):
+        if len(res) != 1:
+            raise RuntimeError("PAR-MAP: word must leave one value")
+        heap[addr + i] = res[0]
+
+
+def install(vm, init=None):
+    # init: installs the host's primitives in each worker (None: kernel only)
+    vm.par_init = init
+    vm._par_pool = None
+    vm.add_fn("PAR-MAP", do_par_map)
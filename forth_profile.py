@@ -0,0 +1,206 @@
+# forth_profile.py
+# Per-word profiler behind PROFILE-ON / PROFILE-OFF / PROFILE-REPORT and
+# vm.profile() / vm.profile_stats().
+#
+# Nothing in the engines tests a flag: switching on replaces the VM's
+# _execute_cf and _run_thread with this module's versions and switching
+# off puts the engine's own back (set_engine), so a VM that isn't being
+# profiled runs exactly the code it always did.
+#
+# While on, every word call goes through Profiler.execute_cf and every
+# thread runs on Profiler.run, a recursive version of the tuple engine
+# (colon calls nest Python calls, so deep recursion meets Python's limit
+# before max_depth; either way it's "Return stack overflow"). Per word it keeps calls, self time (minus the words
+# it called), cumulative time (outermost activation only, so recursion
+# isn't counted twice) and the ops its own thread executed. Lines run
+# with vm.run(handle) count as "(prepared)". Task turns (ACTIVATE after
+# a PAUSE) run on the tuple engine unprofiled.
+
+import json, time
+
+from forth_vm import ForthVM, _clock
+
+_now = getattr(time, "perf_counter", None) or _clock
+
+
+class Profiler:
+    def __init__(self, vm):
+        self.vm = vm
+        self.stats = {}         # header addr (None: prepared lines) -> [calls, self, cum, ops]
+        self.names = {None: "(prepared)"}   # taken when first seen (FORGET may reuse the cells)
+        self._words = {}        # code field -> header addr
+        self._version = -1
+        self._child = []        # time spent in callees, per active call
+        self._depth = {}        # header addr -> active calls (recursion)
+        self.elapsed = 0.0
+        self._t0 = None
+
+    # --- switching ---
+    def start(self):
+        vm = self.vm
+        vm._execute_cf = self.execute_cf
+        vm._run_thread = self.run_thread
+        self._t0 = _now()
+
+    def stop(self):
+        vm = self.vm
+        if vm.__dict__.get("_execute_cf") == self.execute_cf:
+            del vm._execute_cf
+        vm.set_engine(vm.engine)
+        if self._t0 is not None:
+            self.elapsed += _now() - self._t0
+            self._t0 = None
+
+    # --- running ---
+    def word_of(self, cf):
+        vm = self.vm
+        if self._version != vm._dict_version:
+            words = {}
+            p = vm.latest
+            while p:
+                words.setdefault(vm._word_fields(p)[2], p)
+                p = vm.heap[p]
+            self._words = words
+            self._version = vm._dict_version
+        return self._words.get(cf)
+
+    def execute_cf(self, cf):
+        vm = self.vm
+        code = vm.code[cf]
+        tag = code[0] if isinstance(code, tuple) else None
+        if not callable(code) and tag != "THREAD" and tag != "DOES":
+            ForthVM._execute_cf(vm, cf); return     # MARKER, AWAIT
+        w = self.word_of(cf)
+        st = self.stats.get(w)
+        if st is None:
+            st = self.stats[w] = [0, 0.0, 0.0, 0]
+            self.names[w] = vm._word_name(w) if w is not None else "(thread)"
+        st[0] += 1
+        depth = self._depth.get(w, 0)
+        if len(self._child) >= vm.max_depth:
+            raise RuntimeError("Return stack overflow")
+        self._depth[w] = depth + 1
+        self._child.append(0.0)
+        t0 = _now()
+        try:
+            if callable(code):
+                code(vm)
+            elif tag == "THREAD":
+                self.run(st, code[1], code[2], 0)
+            else:
+                vm.S.append(code[4])
+                self.run(st, code[1], code[2], code[3])
+        except RecursionError:
+            raise RuntimeError("Return stack overflow") from None
+        finally:
+            dt = _now() - t0
+            st[1] += dt - self._child.pop()
+            if not depth: st[2] += dt
+            self._depth[w] = depth
+            if self._child: self._child[-1] += dt
+
+    def run_thread(self, vm, start, count, ip=0):
+        # Stands in for vm._run_thread: threads run without a word of their
+        # own (vm.run handles) are charged to "(prepared)"
+        st = self.stats.get(None)
+        if st is None:
+            st = self.stats[None] = [0, 0.0, 0.0, 0]
+        st[0] += 1
+        t0 = _now()
+        self._child.append(0.0)
+        try:
+            self.run(st, start, count, ip)
+        finally:
+            dt = _now() - t0
+            st[1] += dt - self._child.pop()
+            st[2] += dt
+            if self._child: self._child[-1] += dt
+
+    def run(self, st, start, count, ip):
+        vm = self.vm
+        ops = vm.ops
+        heap = vm.heap
+        execute_cf = self.execute_cf
+        end = start + count
+        ip += start
+        n = 0
+        try:
+            while ip < end:
+                op = ops[ip]; ip += 1; n += 1
+                if callable(op):
+                    op(vm); continue
+                tag = op[0]
+                if tag == "LIT":
+                    vm.S.append(op[1])
+                elif tag == "CALL_ADDR":
+                    w = op[1]
+                    execute_cf(w + 2 + (heap[w + 1] & 0x3F))
+                elif tag == "BRANCH":
+                    ip = start + op[1]
+                elif tag == "0BRANCH":
+                    if vm.pop() == 0: ip = start + op[1]
+                elif tag == "LOOP":
+                    R = vm.R
+                    idx = R[-1] + 1
+                    if idx < R[-2]:
+                        R[-1] = idx; ip = start + op[1]
+                    else:
+                        del R[-2:]
+                elif tag == "+LOOP":
+                    R = vm.R
+                    step = vm.pop()
+                    idx = R[-1] + step
+                    if (idx < R[-2]) if step >= 0 else (idx >= R[-2]):
+                        R[-1] = idx; ip = start + op[1]
+                    else:
+                        del R[-2:]
+                elif tag == "DO":
+                    i = vm.pop(); vm.R.append(vm.pop()); vm.R.append(i)
+                elif tag == "EXIT":
+                    return
+                elif tag == "UNLOOP":
+                    if len(vm.R) < 2: raise RuntimeError("UNLOOP without DO")
+                    del vm.R[-2:]
+                elif tag == "LIT+":
+                    if not vm.S: raise RuntimeError("Stack underflow")
+                    vm.S[-1] += op[1]
+                elif tag == "DUPNOT0BRANCH":
+                    if not vm.S: raise RuntimeError("Stack underflow")
+                    if vm.S[-1] != 0: ip = start + op[1]
+                elif tag == "PAUSE":
+                    vm.pause()
+                elif tag == "MS":
+                    vm.pause(vm.pop() / op[1])
+                elif tag == "ACTIVATE":
+                    vm._activate(vm.pop(), start, end, ip)
+                    return
+                else:
+                    raise RuntimeError(f"Bad thread tag {tag}")
+        finally:
+            st[3] += n
+
+    # --- results ---
+    def rows(self):
+        """[(name, calls, self s, cumulative s, ops)], most self time first."""
+        out = []
+        for w, (calls, own, cum, ops) in self.stats.items():
+            out.append((self.names[w], calls, own, cum, ops))
+        out.sort(key=lambda r: r[2], reverse=True)
+        return out
+
+    def json(self):
+        return json.dumps({
+            "elapsed": self.elapsed + (_now() - self._t0 if self._t0 is not None else 0),
+            "words": [{"name": r[0], "calls": r[1], "self": r[2], "cumulative": r[3],
+                       "ops": r[4]} for r in self.rows()],
+        })
+
+    def report(self, out, limit=20):
+        rows = self.rows()
+        total = sum(r[2] for r in rows) or 1
+        out.write(f"{'word':20} {'calls':>9} {'self ms':>10} {'%':>6} {'cum ms':>10} {'ops':>10}")
+        out.cr()
+        for name, calls, own, cum, ops in rows[:limit]:
+            out.write(f"{name[:20]:20} {calls:9} {own * 1e3:10.2f} {own / total * 100:6.1f}"
+                      f" {cum * 1e3:10.2f} {ops:10}")
+            out.cr()
@@ -1,26 +1,206 @@
 #!/usr/bin/env python3
-# forth_vm.py — Heap-based Forth VM (no Python dicts for words)
+# forth_vm.py — Heap-based Forth VM (words live in the heap; a name index
+# beside the linked headers only speeds up lookup)
 # Full script with: error handling, HEX/DECIMAL, ?DUP/PICK/ROLL/DEPTH/CLEAR,
-# SLEEP/MS, IF/ELSE/THEN, BEGIN/AGAIN/UNTIL/WHILE/REPEAT, DO/LOOP/+LOOP/I/J/LEAVE,
-# CREATE/DOES>, CONSTANT/VARIABLE (+ legacy *_2), loader, REPL.
+# SLEEP/MS (yielding), IF/ELSE/THEN, BEGIN/AGAIN/UNTIL/WHILE/REPEAT, DO/LOOP/+LOOP/I/J/LEAVE,
+# CREATE/DOES>, CONSTANT/VARIABLE (+ legacy *_2), FORGET/MARKER, EXIT/RECURSE,
+# S"/TYPE/FLUSH (buffered output, see Output), TASK/ACTIVATE/PAUSE/STOP
+# (cooperative tasks, see Task), loader, REPL.
+# Engines: "tuple" (tag dispatch, non-recursive: call frames on a list of
+# their own, vm.frames),
+# "closure" (pre-decoded threads) or "native" (threads compiled to Python
+# functions, see forth_native.py), chosen with ForthVM(engine=...) or
+# vm.set_engine(...). Only the tuple engine is bounded by max_depth alone;
+# the others nest Python calls per Forth call.
 
 import sys, time
+from array import array
+
+class Handle:
+    # A line compiled once by ForthVM.prepare(); ForthVM.run() executes it
+    def __init__(self, line, start, count, words, version):
+        self.line = line
+        self.start = start; self.count = count
+        self.room = count           # ops its region holds (recompiles reuse it)
+        self.words = words          # (header addr, NAME) of each word called
+        self.version = version      # dictionary version it was bound against
+
+    def __repr__(self):
+        return f"<Handle {self.line!r}>"
+
+
+class Output:
+    # Buffered text output for the printing words. Text is collected and
+    # handed to the sink in one write(): when limit chars are pending, on
+    # CR (on_cr), when interpret() finishes a line or the REPL prompts
+    # (on_line), and on FLUSH / flush(). sink=None means the current
+    # sys.stdout; any object with write(str) works (io.StringIO, a file).
+    def __init__(self, sink=None, limit=512, on_cr=True, on_line=True):
+        self.sink = sink
+        self.limit = limit
+        self.on_cr = on_cr
+        self.on_line = on_line
+        self._parts = []
+        self._size = 0
+
+    def write(self, s):
+        self._parts.append(s)
+        self._size += len(s)
+        if self._size >= self.limit: self.flush()
+
+    def cr(self):
+        self.write("\n")
+        if self.on_cr: self.flush()
+
+    def flush(self):
+        if self._parts:
+            text = "".join(self._parts)
+            self._parts = []; self._size = 0
+            (self.sink or sys.stdout).write(text)
+
+
+class Task:
+    # A cooperative task: its own stacks over the shared dictionary. It runs
+    # on the tuple engine; frame is where it resumes after PAUSE/MS.
+    def __init__(self, name):
+        self.name = name
+        self.S = []
+        self.R = []
+        self.frames = []            # its callers' start, count, ip (flat)
+        self.frame = None           # (start, end, ip)
+        self.state = "idle"         # idle / ready / running / stopped
+        self.wake = 0               # clock time before which it stays asleep
+        self.budget = None          # backward jumps per turn (None: until PAUSE)
+        self.aio = False            # driven by ainterpret (awaits AWAIT words)
+        self.pending = None         # coroutine to await before resuming
+
+    def __repr__(self):
+        return f"<Task {self.name} {self.state}>"
+
+
+class EventRing:
+    # Events (xt, arg) from interrupt handlers and timers, for the VM to
+    # run at token boundaries and at PAUSE/MS (see ForthVM.enable_events).
+    # One producer and one consumer, no lock: post() only moves tail and the
+    # VM only moves head, and it allocates nothing, so an IRQ handler may
+    # call it. A full ring drops the event and counts it.
+    def __init__(self, size=64):
+        self.size = size
+        self.xts = [0] * size
+        self.args = [0] * size
+        self.head = 0               # next event to run (VM side)
+        self.tail = 0               # next free slot (producer side)
+        self.dropped = 0
+
+    def post(self, xt, arg=0):
+        t = self.tail
+        nxt = t + 1
+        if nxt == self.size: nxt = 0
+        if nxt == self.head:
+            self.dropped += 1
+            return False
+        self.xts[t] = xt; self.args[t] = arg
+        self.tail = nxt             # publish after the slot is written
+        return True
+
+
+class TaskStop(Exception):
+    # Raised by STOP: ends the running task
+    pass
+
 
 class ExitFrame(Exception):
+    # Raised by EXIT outside a definition: abandons the rest of the line/file
     pass
 
 IMMEDIATE_FLAG = 0x80  # High bit in flags|namelen cell = IMMEDIATE
+TYPED_CELL = "q"       # array typecode of a typed-heap cell ("i"/"l" on 32-bit boards)
+
+# Ops whose op[1] is a thread index
+BRANCH_TAGS = ("BRANCH", "0BRANCH", "LOOP", "+LOOP", "DUPNOT0BRANCH")
+
+ENGINES = ("tuple", "closure", "native")
+
+_clock = getattr(time, "monotonic", None) or time.time
+
+_templates = {}     # (class, heap, optimize) -> boot dictionary, see ForthVM._snapshot
+
+# Superinstructions emitted by the optimizer (plain ops, so every engine runs them)
+def _op_2dup(vm):                                               # OVER OVER
+    S = vm.S
+    if len(S) < 2: raise RuntimeError("Stack underflow")
+    S.append(S[-2]); S.append(S[-2])
+def _op_nip(vm):                                                # SWAP DROP
+    if len(vm.S) < 2: raise RuntimeError("Stack underflow")
+    del vm.S[-2]
+
+# Op factories for vm.make_op(): closures built from plain arguments, so a
+# saved image can rebuild them (see forth_image.py)
+def _make_push(n):
+    def push_value(vm): vm.S.append(n)
+    return push_value
+
+def _make_print(text):
+    def _print(vm): vm.out.write(text+" ")
+    return _print
+
+def _make_install_does(s, c, b):
+    # Run by the defining word: point the CREATEd word's code field at the
+    # DOES> body, which runs in place with branch targets relative to s
+    def _install_does(vm):
+        hdr = vm.runtime_created_header
+        if hdr is None:
+            raise RuntimeError("DOES>: no CREATE executed at run time")
+        cfaddr = vm._word_fields(hdr)[2]
+        vm.code[cfaddr] = ("DOES", s, c, b, cfaddr + 1)
+    return _install_does
+
+# Boot-time words the optimizer may fold when both operands are literals
+FOLD = {
+    "+": lambda b, a: b + a,
+    "-": lambda b, a: b - a,
+    "*": lambda b, a: b * a,
+    "/": lambda b, a: b // a,
+    "=": lambda b, a: -1 if b == a else 0,
+    "<": lambda b, a: -1 if b < a else 0,
+    ">": lambda b, a: -1 if b > a else 0,
+}
 
 class ForthVM:
-    def __init__(self):
+    def __init__(self, engine="tuple", optimize=False, max_depth=10000,
+                 heap="list", heap_size=64 * 1024):
         # Stacks
         self.S = []     # Data stack
-        self.R = []     # Return stack
-
-        # Heap-backed dictionary
-        self.heap = [0] * (64 * 1024)
+        self.out = Output()             # all word output goes through here
+        self.R = []     # Return stack (loop params, >R)
+        self.frames = []                # tuple engine call frames: start, count, ip (flat)
+        self.max_depth = max_depth      # return stack limit for nested calls
+
+        # Heap-backed dictionary. "list" keeps every cell (data, names, code
+        # fields and thread ops) in one Python list. "typed" keeps data and
+        # name cells in an array of TYPED_CELL, code fields in a table keyed by their
+        # heap address and thread ops in a separate list, so threads take no
+        # heap cells. Either way: self.heap[a] is data, self.code[cf] a code
+        # field and self.ops[i] a thread op (THREAD start/count index ops).
+        if heap == "typed":
+            self.heap = array(TYPED_CELL, [0]) * heap_size
+            self.code = {}
+            self.ops = []
+        elif heap == "list":
+            self.heap = [0] * heap_size
+            self.code = self.ops = self.heap
+        else:
+            raise ValueError(f"Unknown heap {heap!r}")
+        self.typed_heap = heap == "typed"   # what extensions test, not the tables
         self.here = 1
         self.latest = 0
+        # Name index beside the linked headers: NAME -> header addrs, oldest
+        # first, so the last entry is the definition that wins
+        self._index = {}
+        self._dict_version = 0          # bumped on every header added/removed
+        self._cut_version = 0           # version at the last FORGET
+        self._cuts = []                 # (version, first thread op dropped) of recent FORGETs
+        self._cuts_lost = 0             # version of the newest cut dropped from _cuts
 
         # Compiler / defining state
         self.runtime_created_header = None
@@ -29,15 +209,94 @@ class ForthVM:
         self.compiling = False
         self.current_code_list = None
         self.current_code_cfaddr = None
+        self.current_header = None      # word being defined (for RECURSE)
         self.ctrl_stack = []            # control-structure patch info
+        self.optimize = optimize        # peephole pass at ';'
+        self.opt_stats = {}             # word name -> ops removed
+        self.fence = 0
 
         # Input buffer
         self._input_buffer = []
         self._in_pointer = 0
-
-        # Bootstrap
-        self._install_kernel()
-        self._install_highlevel()
+        self.line_cache_size = 256      # LRU of tokenized lines
+        self._line_cache = {}
+        self._resolved = {}             # token -> (TOK, number, word, immediate)
+        self._resolved_base = 10
+
+        # Primitives by image key (see add_fn) and closures made by make_op
+        self._prims = {}
+        self._prim_keys = {}            # id(fn) -> key
+        self._factories = {}
+        self.py_files = []              # files run by PYTHON (LOAD-IMAGE reruns them)
+        self._register_prim("(2DUP)", _op_2dup)
+        self._register_prim("(NIP)", _op_nip)
+        self.register_factory("PUSH", _make_push)
+        self.register_factory("PRINT", _make_print)
+        self.register_factory("DOES>", _make_install_does)
+
+        # Execution engine: "tuple" dispatches on op tags, "closure" runs
+        # threads pre-decoded into bound callables, "native" runs threads
+        # compiled to Python functions (both caches keyed by thread start)
+        self._closures = {}
+        self._native = {}
+        self.set_engine(engine)
+
+        # Cooperative tasks (TASK/ACTIVATE/PAUSE/MS/STOP); None = the operator,
+        # i.e. whoever called interpret()/execute()
+        self.tasks = []
+        self._task = None
+        self._sleep = time.sleep         # hosts may swap it (pf_server releases its lock)
+        self.aio_budget = 1000          # ainterpret: backward jumps between loop turns
+        self._aio_wait = False          # None while ainterpret runs a primitive
+
+        # Interrupt/timer events (ON-PIN-CHANGE, EVERY): None until enabled
+        self.events = None
+        self.event_poll = 0.001         # MS/SLEEP check for events this often
+        self._in_handler = False
+
+        self.profiler = None            # last forth_profile.Profiler (PROFILE-ON)
+
+        # Bootstrap: built once per class/heap/optimize, then copied
+        key = (type(self), heap, optimize)
+        t = _templates.get(key)
+        if t is None:
+            self._install_kernel()
+            self._kernel_end = self.here    # headers below this are primitives
+            self._install_highlevel()
+            self.fence = self.here          # FORGET/MARKER can't reach below this
+            _templates[key] = self._snapshot()
+        else:
+            self._restore(t)
+
+    # ====== Kernel template ======
+    # Primitives only touch the vm they are passed, so a finished boot
+    # dictionary can be shared: new VMs copy its cells and tables.
+    def _snapshot(self):
+        typed = self.typed_heap
+        return {
+            "here": self.here, "latest": self.latest, "kernel_end": self._kernel_end,
+            "heap": self.heap[:self.here],
+            "code": dict(self.code) if typed else None,
+            "ops": list(self.ops) if typed else None,
+            "index": {k: tuple(v) for k, v in self._index.items()},
+            "prims": dict(self._prims), "prim_keys": dict(self._prim_keys),
+            "factories": dict(self._factories),
+            "opt_stats": dict(self.opt_stats),
+        }
+
+    def _restore(self, t):
+        here = t["here"]
+        self._reserve(here - self.here)
+        self.heap[:here] = t["heap"]
+        if t["code"] is not None:
+            self.code = dict(t["code"]); self.ops = list(t["ops"])
+        self.here = self.fence = here
+        self._kernel_end = t["kernel_end"]
+        self.latest = t["latest"]
+        self._index = {k: list(v) for k, v in t["index"].items()}
+        self._prims = dict(t["prims"]); self._prim_keys = dict(t["prim_keys"])
+        self._factories = dict(t["factories"])
+        self.opt_stats = dict(t["opt_stats"])
 
     # ====== Stack ======
     def push(self, x): self.S.append(x)
@@ -47,7 +306,9 @@ class ForthVM:
 
     # ====== Dictionary headers ======
     # Header layout: [link][flags|namelen][name chars...][code field]
-    def _allocate_word_header(self, name, is_immediate=False):
+    def _allocate_word_header(self, name, is_immediate=False, link=True):
+        # link=False: a smudged header, not found until _link() (see ':')
+        self._reserve(len(name) + 3)
         header_addr = self.here
         # link
         self.heap[self.here] = self.latest; self.here += 1
@@ -59,26 +320,141 @@ class ForthVM:
             self.heap[self.here] = ord(ch); self.here += 1
         # code field (placeholder)
         cf = self.here
-        self.heap[self.here] = None; self.here += 1
-        # update latest
-        self.latest = header_addr
+        self.code[self.here] = None; self.here += 1
+        if link:
+            self.latest = header_addr
+            self._index.setdefault(name.upper(), []).append(header_addr)
+            self._resolved.clear(); self._dict_version += 1
         return cf
 
-    def add_fn(self, name, fn, immediate=False):
+    def _link(self, w_addr):
+        # Make a smudged header findable. Other sessions may have added
+        # words since it was allocated, so it goes in at its address: the
+        # chain and each name's index entries stay in address order.
+        heap = self.heap
+        p = self.latest; nxt = 0
+        while p > w_addr: nxt = p; p = heap[p]
+        heap[w_addr] = p
+        if nxt: heap[nxt] = w_addr
+        else: self.latest = w_addr
+        addrs = self._index.setdefault(self._word_name(w_addr).upper(), [])
+        i = len(addrs)
+        while i and addrs[i-1] > w_addr: i -= 1
+        addrs.insert(i, w_addr)
+        self._resolved.clear(); self._dict_version += 1
+
+    def add_fn(self, name, fn, immediate=False, awaitable=False):
+        # awaitable: fn(vm) returns a coroutine (an async def); ainterpret
+        # awaits it on the host's event loop
         cf = self._allocate_word_header(name, is_immediate=immediate)
-        self.heap[cf] = fn
+        self.code[cf] = ("AWAIT", fn) if awaitable else fn
+        self._register_prim(name.upper(), fn)
+
+    def _register_prim(self, key, fn):
+        # Images refer to primitives by key: the add_fn name, NAME#2, #3...
+        # if the name is reused. Ops from make_op are saved as recipes.
+        if id(fn) in self._prim_keys or hasattr(fn, "recipe"): return
+        base = key; n = 1
+        while key in self._prims:
+            n += 1; key = f"{base}#{n}"
+        self._prims[key] = fn; self._prim_keys[id(fn)] = key
+
+    def register_factory(self, kind, factory):
+        self._factories[kind] = factory
+
+    def make_op(self, kind, *args):
+        """Build a closure op with the factory registered for kind."""
+        fn = self._factories[kind](*args)
+        # Kept on the op itself, so it lives and dies with it (images save it)
+        fn.recipe = (kind, args)
+        return fn
+
+    # ====== Images ======
+    def save_image(self, path):
+        from forth_image import save_image
+        save_image(self, path)
+
+    def load_image(self, path):
+        from forth_image import load_image
+        load_image(self, path)
+
+    # ====== Heap size ======
+    def _reserve(self, n):
+        # Make room for n more cells at HERE, growing the heap (in place,
+        # so engines holding a reference keep working) instead of failing
+        need = self.here + n - len(self.heap)
+        if need <= 0: return
+        grow = max(need, len(self.heap) // 2)
+        if not self.typed_heap:
+            self.heap.extend([0] * grow)
+        else:
+            self.heap.frombytes(bytes(self.heap.itemsize * grow))
 
     def _find_word(self, nameU):
+        addrs = self._index.get(nameU)
+        return addrs[-1] if addrs else None
+
+    def _unindex(self, w_addr):
+        name = self._word_name(w_addr).upper()
+        addrs = self._index.get(name)
+        if addrs and addrs[-1] == w_addr:
+            addrs.pop()
+            if not addrs: del self._index[name]
+            self._resolved.clear(); self._dict_version += 1
+
+    def _forget(self, w_addr):
+        # Drop the word at w_addr and everything defined after it
+        if w_addr < self.fence:
+            raise RuntimeError("Can't forget below the fence")
+        # first thread op to drop (typed: the first of the dropped words' threads)
+        cut = len(self.ops) if self.typed_heap else w_addr
         p = self.latest
-        while p:
-            q = p + 1
-            flags_len = self.heap[q]; q += 1
-            nlen = flags_len & 0x3F
-            wname = "".join(chr(self.heap[q+i]) for i in range(nlen))
-            if wname.upper() == nameU:
-                return p
+        while p >= w_addr:
+            cf = self._word_fields(p)[2]
+            if self.typed_heap:
+                code = self.code.pop(cf, None)
+                if isinstance(code, tuple) and code[0] == "THREAD" and code[1] is not None:
+                    cut = min(cut, code[1])
+            else:
+                code = self.heap[cf]
+            self._unindex(p)
+            self._drop_prim(p, code)
             p = self.heap[p]
-        return None
+        self.latest = p
+        self.here = w_addr
+        if self.typed_heap:
+            del self.ops[cut:]
+        for cache in (self._closures, self._native):
+            for start in [s for s in cache if s >= cut]:
+                del cache[start]
+        if self.runtime_created_header is not None and self.runtime_created_header >= w_addr:
+            self.runtime_created_header = None
+        # Space past here may be reused: prepared handles must recompile
+        self._note_cut(cut)
+
+    def _drop_prim(self, w_addr, code):
+        # A forgotten add_fn word takes its image key along, unless an older
+        # word of that name (still defined) runs the same function
+        fn = code[1] if isinstance(code, tuple) and code[0] == "AWAIT" else code
+        key = self._prim_keys.get(id(fn)) if callable(fn) else None
+        name = self._word_name(w_addr).upper()
+        if key is None or key.partition("#")[0] != name: return
+        w = self._find_word(name)
+        if w is not None and self.code[self._word_fields(w)[2]] in (fn, ("AWAIT", fn)): return
+        del self._prims[key]; del self._prim_keys[id(fn)]
+
+    def _note_cut(self, cut):
+        # Thread ops from cut on are gone (FORGET, LOAD-IMAGE: 0). Handles
+        # recompile; one whose region survived keeps it (see _rebind).
+        self._dict_version += 1
+        self._cut_version = self._dict_version
+        self._cuts.append((self._dict_version, cut))
+        if len(self._cuts) > 16:
+            self._cuts_lost = self._cuts.pop(0)[0]
+
+    def _word_name(self, w_addr):
+        nlen = self.heap[w_addr + 1] & 0x3F
+        return "".join(chr(self.heap[w_addr + 2 + i]) for i in range(nlen))
 
     def _word_fields(self, w_addr):
         q = w_addr + 1
@@ -89,60 +465,539 @@ class ForthVM:
 
     # ====== Panic/reset ======
     def _panic(self, e=None):
+        self.out.flush()
         if e is not None:
             print("ERR:", e)
-        # If compiling, unlink half-built header
-        if self.compiling and self.latest:
-            prev = self.heap[self.latest]  # link field
-            self.latest = prev
+        # A half-built definition was never linked (see ':'): just drop it
         # Reset volatile state
-        self.S.clear(); self.R.clear()
+        self.S.clear(); self.R.clear(); self.frames.clear()
         self.compiling = False
         self.current_code_list = None
         self.current_code_cfaddr = None
+        self.current_header = None
         self.ctrl_stack.clear()
         self.pending_does = []
         self.runtime_created_header = None
         self._input_buffer = []; self._in_pointer = 0
 
     # ====== Execution engine ======
+    def set_engine(self, engine):
+        # _run_thread holds the plain function, called as _run_thread(self, ...):
+        # a bound method would make every VM a reference cycle that only the
+        # cyclic GC frees (costly for short-lived VMs with big heaps)
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}")
+        cls = type(self)
+        if engine == "native":
+            # Optional backend: needs compile(), so import only on request
+            from forth_native import compile_thread, stack_fault
+            self._compile_native = compile_thread
+            self._stack_fault = stack_fault
+            self._run_thread = cls._exec_native
+        elif engine == "closure":
+            self._run_thread = cls._exec_closures
+        else:
+            self._run_thread = cls._exec_thread
+        self.engine = engine
+
     def execute(self, w_addr):
-        _, _, cf = self._word_fields(w_addr)
-        code = self.heap[cf]
+        self._execute_cf(w_addr + 2 + (self.heap[w_addr + 1] & 0x3F))
+
+    def _execute_cf(self, cf):
+        # Code field: a primitive, ("THREAD", start, count) or, for words
+        # built by DOES>, ("DOES", start, count, body, pfa)
+        code = self.code[cf]
         if callable(code):
             code(self); return
-        if isinstance(code, tuple) and code[0] == "THREAD":
-            start, count = code[1], code[2]
-            ops = self.heap[start:start+count]
-            self._exec_thread(ops); return
+        tag = code[0] if isinstance(code, tuple) else None
+        if tag == "THREAD":
+            self._run_thread(self, code[1], code[2]); return
+        if tag == "DOES":
+            self.S.append(code[4])
+            self._run_thread(self, code[1], code[2], code[3]); return
+        if tag == "MARKER":
+            self._forget(code[1]); return
+        if tag == "AWAIT":
+            # Awaitable word outside ainterpret: run it on its own event loop
+            import asyncio
+            asyncio.run(code[1](self)); return
         raise RuntimeError("Bad code field")
 
-    def _exec_thread(self, ops):
-        ip = 0
+    def _prepare_thread(self, start, count):
+        # Called by ';' once the thread is in the heap: do the engine's
+        # one-off translation now rather than on the first call
+        if self.engine == "closure":
+            self._closures[start] = self._decode_thread(start, count)
+        elif self.engine == "native":
+            self._native[start] = self._compile_native(self, start, count)
+
+    # --- tuple engine: re-dispatch on each op's tag ---
+    # Runs in place over ops[start:start+count]; branch targets are
+    # relative to start, so nothing is copied per call. Colon words called
+    # from the thread don't recurse in Python: the caller's start, count and
+    # ip go on self.frames (not R, so I and loop parameters see what the
+    # other engines see; three ints rather than a tuple, so a call allocates
+    # no frame object) and the loop carries on in the callee, so EXIT and
+    # the end of a thread just pop a frame.
+    def _exec_thread(self, start, count, ip=0, task=None):
+        # task: resuming that Task (its frames list holds all its callers);
+        # PAUSE/MS then save the frame and return instead of running the others
+        heap = self.heap
+        ops = self.ops
+        codes = self.code
+        frames = self.frames
+        fbase = 0 if task is not None else len(frames)
+        rbase = 0 if task is not None else len(self.R)
+        # Jumps left before a task is suspended (-1: never)
+        steps = task.budget if task is not None and task.budget else -1
+        ip += start
+        end = start + count
+        try:
+            while True:
+                if ip >= end:
+                    if len(frames) <= fbase: return
+                    ip = frames.pop(); count = frames.pop(); start = frames.pop()
+                    end = start + count
+                    continue
+                op = ops[ip]; ip += 1
+                if callable(op):
+                    op(self); continue
+                if not isinstance(op, tuple):
+                    raise RuntimeError(f"Bad op {op!r}")
+                tag = op[0]
+                if tag == "LIT":
+                    self.S.append(op[1])
+                elif tag == "CALL_ADDR":
+                    w = op[1]
+                    cf = w + 2 + (heap[w + 1] & 0x3F)
+                    code = codes[cf]
+                    if callable(code):
+                        code(self); continue
+                    kind = code[0] if isinstance(code, tuple) else None
+                    if kind != "THREAD" and kind != "DOES":
+                        if kind == "AWAIT" and task is not None and task.aio:
+                            # ainterpret: hand the coroutine to the event loop
+                            task.pending = code[1](self)
+                            task.frame = (start, end, ip); task.state = "ready"
+                            return
+                        self._execute_cf(cf); continue
+                    if len(frames) // 3 >= self.max_depth:
+                        raise RuntimeError("Return stack overflow")
+                    frames.append(start); frames.append(count); frames.append(ip)
+                    start = code[1]; count = code[2]; end = start + count; ip = start
+                    if kind == "DOES":
+                        self.S.append(code[4]); ip += code[3]
+                elif tag == "BRANCH":
+                    if op[1] is None: raise RuntimeError("Unpatched BRANCH encountered")
+                    ip = start + op[1]
+                    steps -= 1
+                    if not steps: break
+                elif tag == "0BRANCH":
+                    if op[1] is None: raise RuntimeError("Unpatched 0BRANCH encountered")
+                    flag = self.pop()
+                    if flag == 0:
+                        ip = start + op[1]
+                        steps -= 1
+                        if not steps: break
+                elif tag == "LOOP":
+                    R = self.R
+                    idx = R[-1] + 1
+                    if idx < R[-2]:
+                        R[-1] = idx; ip = start + op[1]
+                        steps -= 1
+                        if not steps: break
+                    else:
+                        del R[-2:]
+                elif tag == "+LOOP":
+                    R = self.R
+                    step = self.pop()
+                    idx = R[-1] + step
+                    if (idx < R[-2]) if step >= 0 else (idx >= R[-2]):
+                        R[-1] = idx; ip = start + op[1]
+                        steps -= 1
+                        if not steps: break
+                    else:
+                        del R[-2:]
+                elif tag == "DO":
+                    i = self.pop(); self.R.append(self.pop()); self.R.append(i)
+                elif tag == "EXIT":
+                    ip = end
+                elif tag == "UNLOOP":
+                    if len(self.R) < 2: raise RuntimeError("UNLOOP without DO")
+                    del self.R[-2:]
+                elif tag == "LIT+":
+                    if not self.S: raise RuntimeError("Stack underflow")
+                    self.S[-1] += op[1]
+                elif tag == "DUPNOT0BRANCH":
+                    if not self.S: raise RuntimeError("Stack underflow")
+                    if self.S[-1] != 0: ip = start + op[1]
+                elif tag == "PAUSE" or tag == "MS":
+                    secs = self.pop() / op[1] if tag == "MS" else 0
+                    if task is None:
+                        self.pause(secs)
+                    else:
+                        task.wake = _clock() + secs
+                        task.frame = (start, end, ip); task.state = "ready"
+                        return
+                elif tag == "ACTIVATE":
+                    self._activate(self.pop(), start, end, ip)
+                    ip = end
+                else:
+                    raise RuntimeError(f"Bad thread tag {tag}")
+            # Out of steps: suspend the task here, as PAUSE would
+            task.wake = 0
+            task.frame = (start, end, ip); task.state = "ready"
+        except BaseException:
+            # Drop the frames and loop parameters of the aborted calls
+            del frames[fbase:]
+            del self.R[rbase:]
+            raise
+
+    # --- closure engine: each op pre-bound once, inner loop just calls ---
+    def _exec_closures(self, start, count, ip=0):
+        code = self._closures.get(start)
+        if code is None:
+            code = self._closures[start] = self._decode_thread(start, count)
+        n = len(code)
+        try:
+            while ip < n:
+                ip = code[ip](ip)
+        except RecursionError:
+            # Colon calls nest Python calls here: Python's stack is the limit
+            raise RuntimeError("Return stack overflow") from None
+
+    def _decode_thread(self, start, count):
+        # Every closure takes the current ip and returns the next one
+        return [self._decode_op(op, start, count) for op in self.ops[start:start+count]]
+
+    def _decode_op(self, op, start=0, count=0):
+        vm = self
+        if callable(op):
+            def run(ip, fn=op):
+                fn(vm); return ip + 1
+            return run
+        if not isinstance(op, tuple):
+            raise RuntimeError(f"Bad op {op!r}")
+        tag = op[0]
+        if tag == "LIT":
+            def run(ip, n=op[1]):
+                vm.S.append(n); return ip + 1
+        elif tag == "CALL_ADDR":
+            codes = self.code
+            # The class's, not self's: a profiler swapped in at decode time
+            # mustn't stay bound in after it's switched off
+            execute_cf = type(self)._execute_cf
+            def run(ip, cf=self._word_fields(op[1])[2]):
+                code = codes[cf]
+                if callable(code):
+                    code(vm)
+                else:
+                    execute_cf(vm, cf)
+                return ip + 1
+        elif tag == "LIT+":
+            def run(ip, n=op[1]):
+                S = vm.S
+                if not S: raise RuntimeError("Stack underflow")
+                S[-1] += n; return ip + 1
+        elif tag in ("BRANCH", "0BRANCH") and op[1] is None:
+            def run(ip, tag=tag):
+                raise RuntimeError(f"Unpatched {tag} encountered")
+        elif tag == "BRANCH":
+            def run(ip, target=op[1]):
+                return target
+        elif tag == "0BRANCH":
+            pop = self.pop
+            def run(ip, target=op[1]):
+                return target if pop() == 0 else ip + 1
+        elif tag == "DUPNOT0BRANCH":
+            def run(ip, target=op[1]):
+                S = vm.S
+                if not S: raise RuntimeError("Stack underflow")
+                return target if S[-1] != 0 else ip + 1
+        elif tag == "LOOP":
+            def run(ip, target=op[1]):
+                R = vm.R
+                idx = R[-1] + 1
+                if idx < R[-2]:
+                    R[-1] = idx; return target
+                del R[-2:]; return ip + 1
+        elif tag == "+LOOP":
+            pop = self.pop
+            def run(ip, target=op[1]):
+                R = vm.R
+                step = pop()
+                idx = R[-1] + step
+                if (idx < R[-2]) if step >= 0 else (idx >= R[-2]):
+                    R[-1] = idx; return target
+                del R[-2:]; return ip + 1
+        elif tag == "DO":
+            pop = self.pop
+            def run(ip):
+                i = pop(); vm.R.append(pop()); vm.R.append(i); return ip + 1
+        elif tag == "EXIT":
+            def run(ip):
+                return sys.maxsize
+        elif tag == "UNLOOP":
+            def run(ip):
+                if len(vm.R) < 2: raise RuntimeError("UNLOOP without DO")
+                del vm.R[-2:]; return ip + 1
+        elif tag == "PAUSE":
+            def run(ip):
+                vm.pause(); return ip + 1
+        elif tag == "MS":
+            def run(ip, k=op[1]):
+                vm.pause(vm.pop() / k); return ip + 1
+        elif tag == "ACTIVATE":
+            def run(ip):
+                vm._activate(vm.pop(), start, start + count, start + ip + 1)
+                return sys.maxsize
+        else:
+            raise RuntimeError(f"Bad thread tag {tag}")
+        return run
+
+    # --- native engine: whole thread compiled to one Python function ---
+    def _exec_native(self, start, count, ip=0):
+        if ip == 0:
+            fn = self._native.get(start, False)
+            if fn is False:
+                fn = self._native[start] = self._compile_native(self, start, count)
+            if fn is not None:
+                try:
+                    fn(self); return
+                except IndexError as e:
+                    if not self._stack_fault(self, fn, e): raise
+                    raise RuntimeError("Stack underflow") from None
+                except RecursionError:
+                    raise RuntimeError("Return stack overflow") from None
+        # DOES> bodies and threads the code generator can't express
+        self._exec_closures(start, count, ip)
+
+    # ====== Tasks ======
+    # Round-robin and cooperative: a task runs until it executes PAUSE, MS,
+    # SLEEP or STOP (or its word ends). The others get their turn while the
+    # operator is in PAUSE or MS, and the VM sleeps only when all are waiting.
+    def pause(self, secs=0):
+        """Run the other tasks for secs (one round if 0)."""
+        w = self._aio_wait
+        if w is not False:
+            # Under ainterpret (see _deferred): add it up, don't block the loop
+            self._aio_wait = secs if w is None else w + secs; return
+        until = _clock() + secs
+        ev = self.events
+        while True:
+            if ev is not None and ev.head != ev.tail: self.run_events()
+            self._run_tasks()
+            now = _clock()
+            if now >= until: return
+            nxt = until
+            for t in self.tasks:
+                if t.state == "ready" and t.wake < nxt: nxt = t.wake
+            if ev is not None and nxt > now + self.event_poll:
+                nxt = now + self.event_poll
+            if nxt > now: self._sleep(nxt - now)
+
+    def _run_tasks(self):
+        now = _clock()
+        for t in self.tasks:
+            if t.state == "ready" and t.wake <= now:
+                self._resume(t)
+
+    def _resume(self, t):
+        try:
+            self._step(t)
+        except Exception as e:
+            self.out.flush()
+            print(f"ERR in task {t.name}:", e)
+
+    def _step(self, t):
+        # Run t until it suspends (state "ready") or ends ("stopped")
+        prev = self._task; S = self.S; R = self.R; frames = self.frames
+        self._task = t; t.state = "running"
+        self.S = t.S; self.R = t.R; self.frames = t.frames
+        start, end, ip = t.frame
+        try:
+            self._exec_thread(start, end - start, ip - start, t)
+            if t.state == "running": t.state = "stopped"     # word ended
+        except TaskStop:
+            t.state = "stopped"
+        except BaseException:
+            t.state = "stopped"
+            raise
+        finally:
+            self._task = prev; self.S = S; self.R = R; self.frames = frames
+
+    # ====== asyncio ======
+    # await vm.ainterpret(line) runs a line without blocking the event loop:
+    # colon words run as a task on the tuple engine that gives the loop a
+    # turn at MS/SLEEP/PAUSE, at awaitable words (add_fn(..., awaitable=True))
+    # and every aio_budget backward jumps. The other tasks run meanwhile.
+    async def ainterpret(self, line):
+        outer = self._input_buffer, self._in_pointer
+        self._input_buffer = self._tokens(line); self._in_pointer = 0
+        try:
+            while self._in_pointer < len(self._input_buffer):
+                tok = self.parse_token()
+                if tok is None: break
+                w = None
+                if not self.compiling and isinstance(tok, str):
+                    tU, n, w, immediate = self._resolve(tok)
+                    if tU == ":": w = None
+                if w is None:
+                    self._interpret_token(tok)      # numbers, strings, compiling
+                else:
+                    await self._aexecute(w)
+                if self.events is not None:
+                    secs = self._deferred(self.run_events)
+                    if secs is not None: await self.apause(secs)
+        finally:
+            self._input_buffer, self._in_pointer = outer
+        if self.out.on_line: self.out.flush()
+
+    async def _aexecute(self, w):
+        cf = self._word_fields(w)[2]
+        code = self.code[cf]
+        tag = code[0] if isinstance(code, tuple) else None
+        if tag == "AWAIT":
+            await code[1](self); return
+        if tag != "THREAD" and tag != "DOES":
+            # Primitives run as usual; the waits they ask for (MS, SLEEP,
+            # PAUSE typed at the prompt or in a word they run) are awaited
+            # after they return
+            secs = self._deferred(self._execute_cf, cf)
+            if secs is not None: await self.apause(secs)
+            return
+        t = Task("AINTERPRET")
+        t.S = self.S; t.aio = True; t.budget = self.aio_budget
+        start = code[1]; ip = start
+        if tag == "DOES":
+            self.S.append(code[4]); ip += code[3]
+        t.frame = (start, start + code[2], ip)
         while True:
-            if ip >= len(ops): return
-            op = ops[ip]; ip += 1
-            if callable(op):
-                op(self); continue
-            if not isinstance(op, tuple):
-                raise RuntimeError(f"Bad op {op!r}")
-            tag = op[0]
-            if tag == "LIT":
-                self.push(op[1])
-            elif tag == "CALL_ADDR":
-                self.execute(op[1])
-            elif tag == "BRANCH":
-                if op[1] is None: raise RuntimeError("Unpatched BRANCH encountered")
-                ip = op[1]
-            elif tag == "0BRANCH":
-                if op[1] is None: raise RuntimeError("Unpatched 0BRANCH encountered")
-                flag = self.pop()
-                if flag == 0: ip = op[1]
+            # Words run from a primitive in the thread (EXECUTE, LOAD) pause
+            # through pause(): those waits come first
+            more = self._deferred(self._step, t)
+            if more is not None: await self.apause(more)
+            if t.state != "ready": return
+            if t.pending is not None:
+                coro = t.pending; t.pending = None
+                await coro
             else:
-                raise RuntimeError(f"Bad thread tag {tag}")
+                await self.apause(max(0, t.wake - _clock()))
+
+    def _deferred(self, fn, *args):
+        # Run fn with every pause() in it, however deeply nested, adding to
+        # a total instead of sleeping; returns the total (None: no pause)
+        self._aio_wait = None
+        try:
+            fn(*args)
+        finally:
+            secs = self._aio_wait; self._aio_wait = False
+        return secs
+
+    def _run_turn(self):
+        ev = self.events
+        if ev is not None and ev.head != ev.tail: self.run_events()
+        self._run_tasks()
+
+    async def apause(self, secs=0):
+        """pause() for the event loop: awaits instead of time.sleep."""
+        import asyncio
+        until = _clock() + secs
+        ev = self.events
+        while True:
+            # Handlers and tasks get their turn; a word they run that pauses
+            # stretches this wait rather than sleeping
+            more = self._deferred(self._run_turn)
+            now = _clock()
+            if more: until = max(until, now + more)
+            nxt = until
+            for t in self.tasks:
+                if t.state == "ready" and t.wake < nxt: nxt = t.wake
+            if ev is not None and nxt > now + self.event_poll:
+                nxt = now + self.event_poll
+            await asyncio.sleep(max(0, nxt - now))
+            if _clock() >= until: return
+
+    # ====== Profiling ======
+    # Optional: forth_profile is imported on first use, and switching on
+    # swaps _execute_cf/_run_thread rather than adding a test to the engines
+    def profile_on(self):
+        """Start a fresh profile (PROFILE-ON)."""
+        from forth_profile import Profiler
+        self.profile_off()
+        self.profiler = Profiler(self)
+        self.profiler.start()
+
+    def profile_off(self):
+        if self.profiler is not None:
+            self.profiler.stop()
+
+    def profile(self):
+        """with vm.profile(): ... profiles the block; stats stay readable."""
+        vm = self
+        class _Profiling:
+            def __enter__(self):
+                vm.profile_on(); return vm.profiler
+            def __exit__(self, *exc):
+                vm.profile_off()
+        return _Profiling()
+
+    def profile_stats(self):
+        """The last profile as JSON: elapsed seconds and per word calls,
+        self and cumulative seconds and ops executed."""
+        if self.profiler is None:
+            raise RuntimeError("No profile: PROFILE-ON first")
+        return self.profiler.json()
+
+    # ====== Events ======
+    def enable_events(self, size=64):
+        """The VM's EventRing, created on first use; producers call its post()."""
+        if self.events is None:
+            self.events = EventRing(size)
+        return self.events
+
+    def run_events(self):
+        """Run the queued event handlers: xt ( arg -- ), each on its own
+        stacks so it can't disturb the word it interrupted."""
+        ev = self.events
+        if ev is None or self._in_handler: return
+        self._in_handler = True
+        S = self.S; R = self.R
+        try:
+            while ev.head != ev.tail:
+                h = ev.head
+                xt = ev.xts[h]; arg = ev.args[h]
+                ev.head = h + 1 if h + 1 < ev.size else 0
+                self.S = [arg]; self.R = []
+                try:
+                    self.execute(xt)
+                except Exception as e:
+                    self.out.flush()
+                    print(f"ERR in handler {self._word_name(xt)}:", e)
+        finally:
+            self.S = S; self.R = R
+            self._in_handler = False
+
+    def _activate(self, tid, start, end, ip):
+        # ACTIVATE: the rest of the running word becomes task tid's code
+        if not 0 <= tid < len(self.tasks):
+            raise RuntimeError(f"ACTIVATE: no task {tid}")
+        t = self.tasks[tid]
+        if t is self._task:
+            raise RuntimeError("ACTIVATE: task can't activate itself")
+        t.S = []; t.R = []; t.frames = []
+        t.frame = (start, end, ip)
+        t.state = "ready"; t.wake = 0
 
     # ====== Tokenizer ======
     def _tokenize(self, line):
+        # Plain lines (no comment or string syntax) split exactly like the
+        # scanner below would; only lines with \ ( or " need the scanner
+        if '\\' not in line and '(' not in line and '"' not in line:
+            return line.split()
+        return self._scan(line)
+
+    def _scan(self, line):
         s=line; i=0; n=len(s); out=[]
         while i<n:
             while i<n and s[i].isspace(): i+=1
@@ -153,37 +1008,86 @@ class ForthVM:
                 while i<n and s[i]!=')': i+=1
                 if i<n: i+=1
                 continue
-            if s[i]=='.' and i+1<n and s[i+1]=='"':
+            if s[i] in '.sS' and i+1<n and s[i+1]=='"':
+                kind='DOTQUOTE' if s[i]=='.' else 'SQUOTE'
                 i+=2
                 if i<n and s[i]==' ': i+=1
                 start=i
                 while i<n and s[i]!='"': i+=1
                 text=s[start:i]
                 if i<n: i+=1
-                out.append(('DOTQUOTE', text)); continue
+                out.append((kind, text)); continue
             start=i
             while i<n and not s[i].isspace():
                 if s[i] in ['\\','('] or (s[i]=='.' and i+1<n and s[i+1]=='"'):
                     break
                 i+=1
-            out.append(s[start:i])
+            tok=s[start:i]
+            out.append(tok)
+            if len(tok)>1 and tok[-1]=='"':
+                # NAME" text" (SPI", I2C"): the text as is, for _parse_string
+                start=i+1 if i<n and s[i].isspace() else i
+                end=s.find('"', start)
+                if end>=0:
+                    out.append(("STRING", s[start:end])); i=end+1
         return out
 
     def parse_token(self):
         if self._in_pointer>=len(self._input_buffer): return None
         t=self._input_buffer[self._in_pointer]; self._in_pointer+=1; return t
     def _next_token(self): return self.parse_token()
+    def _parse_string(self, name):
+        # The text of NAME" text" (scanned raw, see _scan); what follows runs
+        buf=self._input_buffer; i=self._in_pointer
+        if i>=len(buf) or not isinstance(buf[i], tuple) or buf[i][0]!="STRING":
+            raise RuntimeError(f'Unterminated string for {name}')
+        self._in_pointer=i+1
+        return buf[i][1]
     def _parse_number(self, tok):
         try: return int(tok, self.base)
         except: return None
 
+    def _resolve(self, tok):
+        # (TOK, number, word, immediate) for a token, cached until a header
+        # is added/removed or BASE changes (see _allocate_word_header/_unindex)
+        if self.base != self._resolved_base:
+            self._resolved.clear(); self._resolved_base = self.base
+        r = self._resolved.get(tok)
+        if r is None:
+            tU = tok.upper()
+            n = self._parse_number(tok)
+            w = self._find_word(tU) if n is None else None
+            imm = w is not None and bool(self.heap[w + 1] & IMMEDIATE_FLAG)
+            if len(self._resolved) >= 4 * self.line_cache_size:
+                self._resolved.clear()
+            r = self._resolved[tok] = (tU, n, w, imm)
+        return r
+
     # ====== Interpreter / compiler ======
+    def _tokens(self, line):
+        # Tokens per line are kept in a small LRU (hosts re-send the same lines)
+        cache=self._line_cache
+        toks=cache.pop(line, None)
+        if toks is None:
+            toks=tuple(self._tokenize(line))
+            if len(cache) >= self.line_cache_size:
+                del cache[next(iter(cache))]
+        cache[line]=toks
+        return toks
+
     def interpret(self, line):
-        self._input_buffer=self._tokenize(line); self._in_pointer=0
+        toks=self._tokens(line)
+        # Nested calls (LOAD, extensions' install()) keep the caller's line
+        outer=self._input_buffer, self._in_pointer
+        self._input_buffer=toks; self._in_pointer=0
+        ev=self.events
         while self._in_pointer < len(self._input_buffer):
             tok=self.parse_token()
             if tok is None: break
             self._interpret_token(tok)
+            if ev is not None and ev.head != ev.tail: self.run_events()
+        self._input_buffer, self._in_pointer = outer
+        if self.out.on_line: self.out.flush()
 
     def _emit_op(self, op): self.current_code_list.append(op)
     def _patch_op(self, idx, op): self.current_code_list[idx]=op
@@ -193,15 +1097,29 @@ class ForthVM:
         if isinstance(tok, tuple) and tok[0]=="DOTQUOTE":
             text=tok[1]
             if self.compiling:
-                def _print(vm, s=text): sys.stdout.write(s+" ")
-                self._emit_op(_print)
+                self._emit_op(self.make_op("PRINT", text))
+            else:
+                self.out.write(text+" ")
+            return
+
+        # S" string": ( -- addr u ). Compiled, the chars are stored in the
+        # dictionary; interpreted, at HERE without ALLOT (transient, like PAD)
+        if isinstance(tok, tuple) and tok[0]=="SQUOTE":
+            text=tok[1]
+            self._reserve(len(text))
+            addr=self.here
+            for i, ch in enumerate(text):
+                self.heap[addr+i]=ord(ch)
+            if self.compiling:
+                self.here+=len(text)
+                self._emit_op(("LIT", addr)); self._emit_op(("LIT", len(text)))
             else:
-                sys.stdout.write(text+" ")
+                self.push(addr); self.push(len(text))
             return
 
         if not isinstance(tok, str):
             raise RuntimeError(f"Bad token {tok!r}")
-        tU = tok.upper()
+        tU, n, w, immediate = self._resolve(tok)
 
         # Start colon definition
         if tU == ":":
@@ -209,9 +1127,11 @@ class ForthVM:
             name=self._next_token()
             if not name: raise RuntimeError("Missing name after ':'")
             name = name.upper()   # force uppercase dictionary names
-            cf=self._allocate_word_header(name)
-            self.heap[cf]=("THREAD", None, None)
+            # Smudged until ';', so other sessions can't run it half-built
+            cf=self._allocate_word_header(name, link=False)
+            self.code[cf]=("THREAD", None, None)
             self.current_code_cfaddr=cf
+            self.current_header=cf-len(name)-2
             self.current_code_list=[]
             self.ctrl_stack=[]
             self.pending_does=[]
@@ -222,61 +1142,226 @@ class ForthVM:
             # Patch DOES>-skip branches before copying
             for (_, branch_pos, _) in self.pending_does:
                 self._patch_op(branch_pos, ("BRANCH", len(self.current_code_list)))
-            # Copy ops into heap
-            start=self.here
-            for op in self.current_code_list:
-                self.heap[self.here]=op; self.here+=1
-            count=len(self.current_code_list)
+            if self.optimize:
+                self._optimize_current()
+            start, count = self._store_thread(self.current_code_list)
             # Set code field to thread
-            self.heap[self.current_code_cfaddr]=("THREAD", start, count)
-            # Replace install stubs with runtime patchers (for DOES>)
+            self.code[self.current_code_cfaddr]=("THREAD", start, count)
+            # Replace install stubs with runtime patchers (for DOES>).
+            # The created word's code field points into this thread, so the
+            # DOES> body runs in place with branch targets relative to start.
             for (install_pos, _branch_pos, body_index) in self.pending_does:
-                seg_start = start + body_index
-                seg_count = count - body_index
-                def _install_does(vm, ss=seg_start, cc=seg_count):
-                    hdr = vm.runtime_created_header
-                    if hdr is None:
-                        raise RuntimeError("DOES>: no CREATE executed at run time")
-                    cfaddr = vm._word_fields(hdr)[2]
-                    pfa = cfaddr + 1
-                    def _does_runtime(vmm, addr=pfa, s=ss, c=cc):
-                        vmm.push(addr)
-                        ops = vmm.heap[s:s+c]
-                        vmm._exec_thread(ops)
-                    vm.heap[cfaddr] = _does_runtime
-                self.heap[start + install_pos] = _install_does
+                self.ops[start + install_pos] = self.make_op("DOES>", start, count, body_index)
+            self._prepare_thread(start, count)
+            self._link(self.current_header)
             # Reset compiler state
             self.compiling=False
             self.current_code_list=None
             self.current_code_cfaddr=None
+            self.current_header=None
             self.pending_does=[]
             return
 
         # Compile state (not ';')
         if self.compiling:
-            n=self._parse_number(tok)
             if n is not None:
                 self._emit_op(("LIT", n)); return
-            w=self._find_word(tU)
+            h = self.current_header
+            if h is not None and tU == self._word_name(h).upper():
+                self._emit_op(("CALL_ADDR", h)); return     # calls itself
             if w is None: raise RuntimeError(f"Unknown during compile: {tok}")
-            flags_len,_,_=self._word_fields(w)
-            if flags_len & IMMEDIATE_FLAG:
+            if immediate:
                 self.execute(w)  # run now
             else:
                 self._emit_op(("CALL_ADDR", w))
             return
 
         # Interpret state
-        n=self._parse_number(tok)
         if n is not None: self.push(n); return
-        w=self._find_word(tU)
         if w is None: raise RuntimeError(f"Unknown word: {tok}")
         self.execute(w)
 
+    def _store_thread(self, ops):
+        # Copy finished ops into the heap (list) or the ops table (typed)
+        count=len(ops)
+        if not self.typed_heap:
+            self._reserve(count)
+            start=self.here
+            for op in ops:
+                self.heap[self.here]=op; self.here+=1
+        else:
+            start=len(self.ops)
+            self.ops.extend(ops)
+        return start, count
+
+    # ====== Embedding API ======
+    # h = vm.prepare("2DUP * +") compiles the line once into a headerless
+    # thread; vm.run(h, 3, 4) pushes the arguments, runs it on the current
+    # engine and pops and returns what it left above them. If a word the
+    # handle calls is redefined (or FORGET runs) it is recompiled on the
+    # next run, so it always calls the current definitions; the new thread
+    # goes over the old one when it fits there, so a long-lived handle
+    # doesn't grow the dictionary each time it is rebound.
+    def prepare(self, line):
+        ops = self._compile_line(line)
+        start, count = self._store_thread(ops)
+        self._prepare_thread(start, count)
+        return Handle(line, start, count, self._called(ops), self._dict_version)
+
+    def _called(self, ops):
+        return [(op[1], self._word_name(op[1]).upper()) for op in ops
+                if isinstance(op, tuple) and op[0] == "CALL_ADDR"]
+
+    def _compile_line(self, line):
+        # The ops of line compiled as a headerless thread (not stored yet)
+        if self.compiling:
+            raise RuntimeError("prepare() while compiling")
+        saved = self._input_buffer, self._in_pointer
+        self._input_buffer = tuple(self._tokenize(line)); self._in_pointer = 0
+        self.compiling = True
+        self.current_code_list = []; self.ctrl_stack = []; self.pending_does = []
+        try:
+            while self._in_pointer < len(self._input_buffer):
+                tok = self.parse_token()
+                if tok is None: break
+                if tok == ":" or tok == ";":
+                    raise RuntimeError(f"prepare(): {tok} not allowed")
+                self._interpret_token(tok)
+            if self.ctrl_stack:
+                raise RuntimeError("prepare(): unfinished control structure")
+            if self.pending_does:
+                raise RuntimeError("prepare(): DOES> not allowed")
+            for op in self.current_code_list:
+                if isinstance(op, tuple) and op[0] in BRANCH_TAGS and op[1] is None:
+                    raise RuntimeError("prepare(): unresolved branch")
+            if self.optimize:
+                self._optimize_current()
+            return self.current_code_list
+        finally:
+            self.compiling = False
+            self.current_code_list = None
+            self.ctrl_stack = []; self.pending_does = []
+            self._input_buffer, self._in_pointer = saved
+
+    def run(self, handle, *args):
+        if handle.version != self._dict_version:
+            self._rebind(handle)
+        S = self.S
+        base = len(S)
+        S.extend(args)
+        self._run_thread(self, handle.start, handle.count)
+        if len(S) < base: base = len(S)
+        out = S[base:]
+        del S[base:]
+        return out
+
+    def _rebind(self, handle):
+        stale = handle.version < self._cut_version
+        if not stale:
+            for w, name in handle.words:
+                if self._find_word(name) != w:
+                    stale = True; break
+        if stale:
+            ops = self._compile_line(handle.line)
+            start = handle.start
+            if len(ops) <= handle.room and self._region_intact(handle):
+                for i, op in enumerate(ops):
+                    self.ops[start + i] = op
+                self._closures.pop(start, None); self._native.pop(start, None)
+            else:
+                start, handle.room = self._store_thread(ops)
+            handle.start = start; handle.count = len(ops)
+            handle.words = self._called(ops)
+            self._prepare_thread(start, handle.count)
+        handle.version = self._dict_version
+
+    def _region_intact(self, handle):
+        # Still the handle's: no FORGET since it was bound cut into it
+        if handle.version < self._cuts_lost:
+            return False            # older than the cuts we remember
+        end = handle.start + handle.room
+        for version, cut in self._cuts:
+            if version > handle.version and cut < end:
+                return False
+        return True
+
+    # ====== Peephole optimizer ======
+    def _std_name(self, w):
+        # Name of a boot-time word (meaning known), None for user words
+        if self.fence and w >= self.fence: return None
+        return self._word_name(w).upper()
+
+    def _optimize_current(self):
+        ops = self.current_code_list
+        keep = {len(ops)}
+        for op in ops:
+            if isinstance(op, tuple) and op[0] in BRANCH_TAGS:
+                keep.add(op[1])
+        for entry in self.pending_does:
+            keep.update(entry)
+        new_ops, where = self._optimize(ops, keep)
+        for i, op in enumerate(new_ops):
+            if isinstance(op, tuple) and op[0] in BRANCH_TAGS:
+                new_ops[i] = (op[0], where[op[1]])
+        self.pending_does = [tuple(where[i] for i in entry) for entry in self.pending_does]
+        self.current_code_list = new_ops
+        if len(new_ops) < len(ops) and self.current_header is not None:
+            self.opt_stats[self._word_name(self.current_header)] = len(ops) - len(new_ops)
+
+    def _optimize(self, ops, keep):
+        # One pass, reducing the tail of the output after each op is added
+        # (so folds chain: 2 3 + 4 * -> 20). A fused window may only start
+        # at an index in keep (a branch target or entry point), never span one.
+        out, entry, where = [], [], {}
+        for i, op in enumerate(ops):
+            where[i] = len(out)
+            out.append(op); entry.append(i in keep)
+            while self._reduce(out, entry):
+                pass
+        where[len(ops)] = len(out)
+        return out, where
+
+    def _reduce(self, out, entry):
+        def call(k):
+            op = out[-k]
+            if isinstance(op, tuple) and op[0] == "CALL_ADDR":
+                return self._std_name(op[1])
+            return None
+        def lit(k):
+            op = out[-k]
+            return isinstance(op, tuple) and op[0] == "LIT" and type(op[1]) is int
+        def fuse(k, new):
+            if any(entry[-k+1:]): return False
+            del out[-k:]; first = entry[-k]; del entry[-k:]
+            out.extend(new); entry.extend([first] + [False] * (len(new) - 1))
+            return True
+
+        n = len(out)
+        last = call(1) if n >= 1 else None
+        if n >= 3 and last in FOLD and lit(2) and lit(3):
+            a, b = out[-2][1], out[-3][1]
+            if not (last == "/" and a == 0):
+                return fuse(3, [("LIT", FOLD[last](b, a))])
+        if n >= 2 and last in ("+", "-") and lit(2):
+            n_ = out[-2][1]
+            return fuse(2, [("LIT+", n_ if last == "+" else -n_)])
+        if (n >= 2 and isinstance(out[-1], tuple) and out[-1][0] == "LIT+"
+                and isinstance(out[-2], tuple) and out[-2][0] == "LIT+"):
+            return fuse(2, [("LIT+", out[-2][1] + out[-1][1])])
+        if n >= 2 and last == "OVER" and call(2) == "OVER":
+            return fuse(2, [_op_2dup])
+        if n >= 2 and last == "DROP" and call(2) == "SWAP":
+            return fuse(2, [_op_nip])
+        if (n >= 3 and isinstance(out[-1], tuple) and out[-1][0] == "0BRANCH"
+                and call(2) == "NOT" and call(3) == "DUP"):
+            return fuse(3, [("DUPNOT0BRANCH", out[-1][1])])
+        return False
+
     # ====== REPL ======
     def repl(self):
         while True:
             try:
+                self.out.flush()
                 line=input("ok> ")
                 if not line: continue
                 if line.strip().upper()=="BYE": raise SystemExit
@@ -287,13 +1372,28 @@ class ForthVM:
                 break
             except Exception as e:
                 self._panic(e)
+        self.out.flush()
+
+    def set_output(self, sink):
+        """Send word output to sink (None = sys.stdout); returns the old sink."""
+        self.out.flush()
+        old = self.out.sink
+        self.out.sink = sink
+        return old
 
     # ====== Kernel words ======
     def _install_kernel(self):
         # I/O & debug
-        self.add_fn(".", lambda vm: sys.stdout.write(str(vm.pop())+" "))
-        self.add_fn("CR", lambda vm: sys.stdout.write("\n"))
-        self.add_fn("EMIT", lambda vm: sys.stdout.write(chr(vm.pop() & 0xFF)))
+        self.add_fn(".", lambda vm: vm.out.write(str(vm.pop())+" "))
+        self.add_fn("CR", lambda vm: vm.out.cr())
+        self.add_fn("EMIT", lambda vm: vm.out.write(chr(vm.pop() & 0xFF)))
+        self.add_fn("FLUSH", lambda vm: vm.out.flush())
+
+        # TYPE ( addr u -- ): the chars in one write
+        def TYPE(vm):
+            u=vm.pop(); a=vm.pop()
+            vm.out.write("".join([chr(c & 0xFF) for c in vm.heap[a:a+u]]))
+        self.add_fn("TYPE", TYPE)
 
         def WORDS(vm):
             p=vm.latest; names=[]
@@ -301,22 +1401,31 @@ class ForthVM:
                 q=p+1; fl=vm.heap[q]; q+=1; nlen=fl&0x3F
                 names.append("".join(chr(vm.heap[q+i]) for i in range(nlen)))
                 p=vm.heap[p]
-            sys.stdout.write(" ".join(names)+"\n")
+            vm.out.write(" ".join(names)); vm.out.cr()
         self.add_fn("WORDS", WORDS)
 
         def DOT_S(vm):
-            sys.stdout.write(f"<{len(vm.S)}> ")
-            for x in vm.S: sys.stdout.write(str(x)+" ")
-            sys.stdout.write("\n")
+            vm.out.write(f"<{len(vm.S)}> " + "".join([str(x)+" " for x in vm.S]))
+            vm.out.cr()
         self.add_fn(".S", DOT_S)
 
         # Stack ops
         self.add_fn("DROP", lambda vm: vm.pop())
-        self.add_fn("DUP",  lambda vm: vm.push(vm.S[-1]))
+        # DUP/SWAP/OVER index S: an IndexError there is an underflow
+        def DUP(vm):
+            try: vm.S.append(vm.S[-1])
+            except IndexError: raise RuntimeError("Stack underflow") from None
+        self.add_fn("DUP", DUP)
         self.add_fn("?DUP", lambda vm: (vm.S.append(vm.S[-1]) if vm.S and vm.S[-1]!=0 else None))
-        def SWAP(vm): vm.S[-1], vm.S[-2] = vm.S[-2], vm.S[-1]
+        def SWAP(vm):
+            S = vm.S
+            try: S[-1], S[-2] = S[-2], S[-1]
+            except IndexError: raise RuntimeError("Stack underflow") from None
         self.add_fn("SWAP", SWAP)
-        self.add_fn("OVER", lambda vm: vm.push(vm.S[-2]))
+        def OVER(vm):
+            try: vm.S.append(vm.S[-2])
+            except IndexError: raise RuntimeError("Stack underflow") from None
+        self.add_fn("OVER", OVER)
         self.add_fn("DEPTH", lambda vm: vm.push(len(vm.S)))
         self.add_fn("CLEAR", lambda vm: vm.S.clear())
 
@@ -347,44 +1456,111 @@ class ForthVM:
         self.add_fn(">", lambda vm: (lambda a,b: vm.push(-1 if b>a else 0))(vm.pop(), vm.pop()))
 
         # Sleep
-        self.add_fn("SLEEP", lambda vm: time.sleep(vm.pop()))
-        self.add_fn("MS",    lambda vm: time.sleep(vm.pop()/1000.0))
+        # SLEEP (s) / MS (ms) / PAUSE let the other tasks run meanwhile.
+        # Compiled they are ops, so a task can suspend there and resume later.
+        # ("MS", units per second): an int, so the op can go in an image.
+        def waiter(tag, per_sec):
+            def W(vm):
+                if vm.compiling:
+                    vm.current_code_list.append((tag, per_sec) if per_sec else (tag,))
+                else:
+                    vm.pause(vm.pop() / per_sec if per_sec else 0)
+            return W
+        self.add_fn("SLEEP", waiter("MS", 1), immediate=True)
+        self.add_fn("MS",    waiter("MS", 1000), immediate=True)
+        self.add_fn("PAUSE", waiter("PAUSE", 0), immediate=True)
+
+        # TASK name ( -- ) defines name ( -- tid ); tid ACTIVATE runs the rest
+        # of the word in that task; STOP ends the running task
+        def W_TASK(vm):
+            name = vm._next_token()
+            if not name: raise RuntimeError("TASK needs a name")
+            vm.tasks.append(Task(name.upper()))
+            vm.add_fn(name, vm.make_op("PUSH", len(vm.tasks) - 1))
+        self.add_fn("TASK", W_TASK)
+
+        def W_ACTIVATE(vm):
+            need_compile(vm, "ACTIVATE")
+            vm.current_code_list.append(("ACTIVATE",))
+        self.add_fn("ACTIVATE", W_ACTIVATE, immediate=True)
+
+        def W_STOP(vm):
+            if vm._task is None: raise RuntimeError("STOP outside a task")
+            raise TaskStop()
+        self.add_fn("STOP", W_STOP)
 
         # Return stack
         self.add_fn(">R", lambda vm: vm.R.append(vm.pop()))
         self.add_fn("R>", lambda vm: vm.push(vm.R.pop()))
         self.add_fn("R@", lambda vm: vm.push(vm.R[-1]))
 
-        # Memory
-        self.add_fn("HERE", lambda vm: vm.push(self.here))
-        def COMMA(vm): v=vm.pop(); vm.heap[vm.here]=v; vm.here+=1
+        # Memory (one address unit per cell; a character occupies a cell)
+        self.add_fn("HERE", lambda vm: vm.push(vm.here))
+        def COMMA(vm): v=vm.pop(); vm._reserve(1); vm.heap[vm.here]=v; vm.here+=1
         self.add_fn(",", COMMA)
         def STORE(vm): addr=vm.pop(); val=vm.pop(); vm.heap[addr]=val
         def FETCH(vm): addr=vm.pop(); vm.push(vm.heap[addr])
         self.add_fn("!", STORE)
         self.add_fn("@", FETCH)
+        def CSTORE(vm): addr=vm.pop(); val=vm.pop(); vm.heap[addr]=val & 0xFF
+        def CFETCH(vm): addr=vm.pop(); vm.push(vm.heap[addr] & 0xFF)
+        self.add_fn("C!", CSTORE)
+        self.add_fn("C@", CFETCH)
+        self.add_fn("CELLS", lambda vm: None)     # ( n -- n ) 1 cell = 1 unit
+        def ALLOT(vm):
+            n=vm.pop()
+            if n > 0: vm._reserve(n)
+            if vm.here + n < vm.fence: raise RuntimeError("ALLOT below the fence")
+            vm.here+=n
+        self.add_fn("ALLOT", ALLOT)
+        self.add_fn("CELL+", lambda vm: vm.push(vm.pop() + 1))
 
         # Base switching
         self.add_fn("DECIMAL", lambda vm: setattr(vm, "base", 10))
         self.add_fn("HEX",     lambda vm: setattr(vm, "base", 16))
 
         # EXIT / BYE
-        self.add_fn("EXIT", lambda vm: (_ for _ in ()).throw(ExitFrame()), immediate=True)
+        # Compiled, EXIT is an op that returns from the current word;
+        # interpreted, it stops the current line (and LOAD of a file)
+        def W_EXIT(vm):
+            if not vm.compiling: raise ExitFrame()
+            vm.current_code_list.append(("EXIT",))
+        self.add_fn("EXIT", W_EXIT, immediate=True)
         self.add_fn("BYE",  lambda vm: (_ for _ in ()).throw(SystemExit()))
 
+        # RECURSE: call the word being defined
+        def W_RECURSE(vm):
+            if not vm.compiling: raise RuntimeError("RECURSE only valid during compilation")
+            vm.current_code_list.append(("CALL_ADDR", vm.current_header))
+        self.add_fn("RECURSE", W_RECURSE, immediate=True)
+
+        # Execution tokens: an xt is the word's header address
+        def W_TICK(vm):
+            name = vm._next_token()
+            if not name: raise RuntimeError("' needs a name")
+            w = vm._find_word(name.upper())
+            if w is None: raise RuntimeError(f"': unknown word {name}")
+            return w
+        self.add_fn("'", lambda vm: vm.push(W_TICK(vm)))
+        def W_BRACKET_TICK(vm):
+            need_compile(vm, "[']")
+            vm.current_code_list.append(("LIT", W_TICK(vm)))
+        self.add_fn("[']", W_BRACKET_TICK, immediate=True)
+        self.add_fn("EXECUTE", lambda vm: vm.execute(vm.pop()))
+
         # ----- Control flow (immediate) -----
-        def need_compile(name):
-            if not self.compiling: raise RuntimeError(f"{name} only valid during compilation")
+        def need_compile(vm, name):
+            if not vm.compiling: raise RuntimeError(f"{name} only valid during compilation")
 
         # IF/ELSE/THEN
         def W_IF(vm):
-            need_compile("IF")
+            need_compile(vm, "IF")
             vm.current_code_list.append(("0BRANCH", None))
             vm.ctrl_stack.append(("IF", len(vm.current_code_list)-1))
         self.add_fn("IF", W_IF, immediate=True)
 
         def W_ELSE(vm):
-            need_compile("ELSE")
+            need_compile(vm, "ELSE")
             if not vm.ctrl_stack or vm.ctrl_stack[-1][0] != "IF":
                 raise RuntimeError("ELSE without IF")
             _, ifpos = vm.ctrl_stack.pop()
@@ -395,7 +1571,7 @@ class ForthVM:
         self.add_fn("ELSE", W_ELSE, immediate=True)
 
         def W_THEN(vm):
-            need_compile("THEN")
+            need_compile(vm, "THEN")
             if not vm.ctrl_stack or vm.ctrl_stack[-1][0] not in ("IF","ELSE"):
                 raise RuntimeError("THEN without IF/ELSE")
             _, pos = vm.ctrl_stack.pop()
@@ -405,12 +1581,12 @@ class ForthVM:
 
         # BEGIN/AGAIN/UNTIL/WHILE/REPEAT
         def W_BEGIN(vm):
-            need_compile("BEGIN")
+            need_compile(vm, "BEGIN")
             vm.ctrl_stack.append(("BEGIN", len(vm.current_code_list)))
         self.add_fn("BEGIN", W_BEGIN, immediate=True)
 
         def W_AGAIN(vm):
-            need_compile("AGAIN")
+            need_compile(vm, "AGAIN")
             if not vm.ctrl_stack or vm.ctrl_stack[-1][0] != "BEGIN":
                 raise RuntimeError("AGAIN without BEGIN")
             _, bpos = vm.ctrl_stack.pop()
@@ -418,7 +1594,7 @@ class ForthVM:
         self.add_fn("AGAIN", W_AGAIN, immediate=True)
 
         def W_UNTIL(vm):
-            need_compile("UNTIL")
+            need_compile(vm, "UNTIL")
             if not vm.ctrl_stack or vm.ctrl_stack[-1][0] != "BEGIN":
                 raise RuntimeError("UNTIL without BEGIN")
             _, bpos = vm.ctrl_stack.pop()
@@ -426,7 +1602,7 @@ class ForthVM:
         self.add_fn("UNTIL", W_UNTIL, immediate=True)
 
         def W_WHILE(vm):
-            need_compile("WHILE")
+            need_compile(vm, "WHILE")
             # find nearest BEGIN
             bpos=None
             for i in range(len(vm.ctrl_stack)-1, -1, -1):
@@ -438,7 +1614,7 @@ class ForthVM:
         self.add_fn("WHILE", W_WHILE, immediate=True)
 
         def W_REPEAT(vm):
-            need_compile("REPEAT")
+            need_compile(vm, "REPEAT")
             if not vm.ctrl_stack or vm.ctrl_stack[-1][0] != "WHILE":
                 raise RuntimeError("REPEAT without WHILE")
             _, while_pos, bpos = vm.ctrl_stack.pop()
@@ -458,13 +1634,12 @@ class ForthVM:
             header = vm.latest
             pfa = cf + 1
             # Default runtime for the created word: push PFA when *that* word runs
-            def created_runtime(vmm, addr=pfa): vmm.push(addr)
-            vm.heap[cf] = created_runtime
+            vm.code[cf] = vm.make_op("PUSH", pfa)
             vm.runtime_created_header = header   # recorded at run time for DOES>
         self.add_fn("CREATE", W_CREATE)
 
         def W_DOES(vm):
-            need_compile("DOES>")
+            need_compile(vm, "DOES>")
             # Insert an install stub (callable placeholder) *and* a skip-branch.
             install_pos = len(vm.current_code_list)
             vm.current_code_list.append(lambda _vm: None)  # placeholder
@@ -474,108 +1649,63 @@ class ForthVM:
             vm.pending_does.append((install_pos, branch_pos, body_index))
         self.add_fn("DOES>", W_DOES, immediate=True)
 
+        # FORGET name / MARKER name: trim the dictionary and HERE together
+        def W_FORGET(vm):
+            name = vm._next_token()
+            if not name: raise RuntimeError("FORGET needs a name")
+            w = vm._find_word(name.upper())
+            if w is None: raise RuntimeError(f"FORGET: unknown word {name}")
+            vm._forget(w)
+        self.add_fn("FORGET", W_FORGET)
+
+        def W_MARKER(vm):
+            name = vm._next_token()
+            if not name: raise RuntimeError("MARKER needs a name")
+            cf = vm._allocate_word_header(name)
+            vm.code[cf] = ("MARKER", vm.latest)   # running it forgets itself
+        self.add_fn("MARKER", W_MARKER)
+
         # EXIT / BYE (also defined above)
-        self.add_fn("EXIT", lambda vm: (_ for _ in ()).throw(ExitFrame()), immediate=True)
+        self.add_fn("EXIT", W_EXIT, immediate=True)
         self.add_fn("BYE",  lambda vm: (_ for _ in ()).throw(SystemExit()))
 
-        # ===== Counted loops: DO / LOOP / +LOOP / I / J / LEAVE =====
-
-        # Helpers used in loop threads
-        def _loop_enter(vm):
-            # ( limit start -- ) => R: ... limit index
-            start = vm.pop()
-            limit = vm.pop()
-            vm.R.append(limit)
-            vm.R.append(start)
-
-        def _loop_step_const(vm, step=1):
-            # increment index; push f: 0 = continue, -1 = done
-            idx = vm.R[-1]; limit = vm.R[-2]
-            idx += step
-            if idx < limit:
-                vm.R[-1] = idx
-                vm.push(0)
-            else:
-                vm.R.pop(); vm.R.pop()
-                vm.push(-1)
-
-        def _loop_step_var(vm):
-            # ( n -- ) add n to index; push f as above
-            step = vm.pop()
-            idx = vm.R[-1]; limit = vm.R[-2]
-            idx += step
-            if idx < limit:
-                vm.R[-1] = idx
-                vm.push(0)
-            else:
-                vm.R.pop(); vm.R.pop()
-                vm.push(-1)
+        # ===== Counted loops: DO / LOOP / +LOOP / I / J / LEAVE / UNLOOP =====
+        # Compiled to loop opcodes that keep limit/index on R (so I and J
+        # still read R[-1]/R[-3]) and branch back in a single dispatch:
+        #   ("DO",) body... ("LOOP", body_start) | ("+LOOP", body_start)
+        # LEAVE is ("UNLOOP",) followed by a BRANCH past the loop.
 
-        def _leave_pop(vm):
-            if len(vm.R) < 2: raise RuntimeError("LEAVE without DO")
-            vm.R.pop(); vm.R.pop()
+        def _end_loop(vm, name):
+            if not vm.ctrl_stack or vm.ctrl_stack[-1][0] != "LEAVE-LIST":
+                raise RuntimeError(f"{name}: internal leave list missing")
+            _, leave_list = vm.ctrl_stack.pop()
+            if not vm.ctrl_stack or vm.ctrl_stack[-1][0] != "DO":
+                raise RuntimeError(f"{name} without DO")
+            _, loop_start = vm.ctrl_stack.pop()
+            vm.current_code_list.append((name, loop_start))
+            for pos in leave_list:
+                vm.current_code_list[pos] = ("BRANCH", len(vm.current_code_list))
 
         # DO
         def W_DO(vm):
-            need_compile("DO")
-            vm.current_code_list.append(_loop_enter)
+            need_compile(vm, "DO")
+            vm.current_code_list.append(("DO",))
             loop_start = len(vm.current_code_list)
             vm.ctrl_stack.append(("DO", loop_start))
             vm.ctrl_stack.append(("LEAVE-LIST", []))
         self.add_fn("DO", W_DO, immediate=True)
 
-        # LOOP — consumes all flags; no stack junk
+        # LOOP: index+1, branch back while index < limit
         def W_LOOP(vm):
-            need_compile("LOOP")
-            if not vm.ctrl_stack or vm.ctrl_stack[-1][0] != "LEAVE-LIST":
-                raise RuntimeError("LOOP: internal leave list missing")
-            _, leave_list = vm.ctrl_stack.pop()
-            if not vm.ctrl_stack or vm.ctrl_stack[-1][0] != "DO":
-                raise RuntimeError("LOOP without DO")
-            _, loop_start = vm.ctrl_stack.pop()
-
-            vm.current_code_list.append(_loop_step_const)
-            dup_w  = self._find_word("DUP")
-            not_w  = self._find_word("NOT")
-            drop_w = self._find_word("DROP")
-            vm.current_code_list.append(("CALL_ADDR", dup_w))
-            vm.current_code_list.append(("CALL_ADDR", not_w))
-            if_pos_idx = len(vm.current_code_list)
-            vm.current_code_list.append(("0BRANCH", None))
-            vm.current_code_list.append(("CALL_ADDR", drop_w))
-            vm.current_code_list.append(("BRANCH", loop_start))
-            vm.current_code_list[if_pos_idx] = ("0BRANCH", len(vm.current_code_list))
-            vm.current_code_list.append(("CALL_ADDR", drop_w))
-
-            for pos in leave_list:
-                vm.current_code_list[pos] = ("BRANCH", len(vm.current_code_list))
+            need_compile(vm, "LOOP")
+            _end_loop(vm, "LOOP")
         self.add_fn("LOOP", W_LOOP, immediate=True)
 
-        # +LOOP
+        # +LOOP: index+n; a positive step runs while index < limit, a
+        # negative one while index >= limit (i.e. until it crosses limit-1)
         def W_PLOOP(vm):
-            need_compile("+LOOP")
-            if not vm.ctrl_stack or vm.ctrl_stack[-1][0] != "LEAVE-LIST":
-                raise RuntimeError("+LOOP: internal leave list missing")
-            _, leave_list = vm.ctrl_stack.pop()
-            if not vm.ctrl_stack or vm.ctrl_stack[-1][0] != "DO":
-                raise RuntimeError("+LOOP without DO")
-            _, loop_start = vm.ctrl_stack.pop()
-
-            vm.current_code_list.append(_loop_step_var)
-            dup_w  = self._find_word("DUP")
-            not_w  = self._find_word("NOT")
-            drop_w = self._find_word("DROP")
-            vm.current_code_list.append(("CALL_ADDR", dup_w))
-            vm.current_code_list.append(("CALL_ADDR", not_w))
-            if_pos_idx = len(vm.current_code_list)
-            vm.current_code_list.append(("0BRANCH", None))
-            vm.current_code_list.append(("CALL_ADDR", drop_w))
-            vm.current_code_list.append(("BRANCH", loop_start))
-            vm.current_code_list[if_pos_idx] = ("0BRANCH", len(vm.current_code_list))
-            vm.current_code_list.append(("CALL_ADDR", drop_w))
-
-            for pos in leave_list:
-                vm.current_code_list[pos] = ("BRANCH", len(vm.current_code_list))
+            need_compile(vm, "+LOOP")
+            _end_loop(vm, "+LOOP")
         self.add_fn("+LOOP", W_PLOOP, immediate=True)
 
         # I, J
@@ -584,8 +1714,8 @@ class ForthVM:
 
         # LEAVE
         def W_LEAVE(vm):
-            need_compile("LEAVE")
-            vm.current_code_list.append(_leave_pop)
+            need_compile(vm, "LEAVE")
+            vm.current_code_list.append(("UNLOOP",))
             vm.current_code_list.append(("BRANCH", None))
             br_pos = len(vm.current_code_list)-1
             # record in nearest LEAVE-LIST
@@ -597,6 +1727,41 @@ class ForthVM:
                 raise RuntimeError("LEAVE outside DO...LOOP")
         self.add_fn("LEAVE", W_LEAVE, immediate=True)
 
+        # UNLOOP: drop the loop parameters (before EXIT inside a loop)
+        def W_UNLOOP(vm):
+            need_compile(vm, "UNLOOP")
+            vm.current_code_list.append(("UNLOOP",))
+        self.add_fn("UNLOOP", W_UNLOOP, immediate=True)
+
+        # Optimizer switch and report
+        self.add_fn("OPTIMIZE",  lambda vm: setattr(vm, "optimize", True))
+        self.add_fn("-OPTIMIZE", lambda vm: setattr(vm, "optimize", False))
+        def OPT_STATS(vm):
+            for name, removed in vm.opt_stats.items():
+                vm.out.write(f"{name} -{removed} ops"); vm.out.cr()
+        self.add_fn("OPT-STATS", OPT_STATS)
+
+        # Profiler (forth_profile.py)
+        self.add_fn("PROFILE-ON", lambda vm: vm.profile_on())
+        self.add_fn("PROFILE-OFF", lambda vm: vm.profile_off())
+        def PROFILE_REPORT(vm):
+            if vm.profiler is None: raise RuntimeError("No profile: PROFILE-ON first")
+            vm.profiler.report(vm.out)
+        self.add_fn("PROFILE-REPORT", PROFILE_REPORT)
+
+        # SAVE-IMAGE file / LOAD-IMAGE file: snapshot or restore the dictionary
+        def W_SAVE_IMAGE(vm):
+            path = vm._next_token()
+            if not path: raise RuntimeError("SAVE-IMAGE needs a filename")
+            vm.save_image(path)
+        self.add_fn("SAVE-IMAGE", W_SAVE_IMAGE)
+
+        def W_LOAD_IMAGE(vm):
+            path = vm._next_token()
+            if not path: raise RuntimeError("LOAD-IMAGE needs a filename")
+            vm.load_image(path)
+        self.add_fn("LOAD-IMAGE", W_LOAD_IMAGE)
+
     # ====== High-level helpers and definers ======
     def _install_highlevel(self):
         # Loader with error reporting and safe recovery
@@ -612,8 +1777,9 @@ class ForthVM:
                             # normal EXIT from colon def inside file
                             return
                         except Exception as e:
+                            vm.out.flush()
                             print(f"ERR in {fname}:{lineno}:", e)
-                            vm._panic()  # unlink half-built word, reset stacks
+                            vm._panic()  # drop half-built word, reset stacks
                             break
             except OSError:
                 raise RuntimeError(f"Missing {fname}")
@@ -650,15 +1816,16 @@ class ForthVM:
             name=vm._next_token()
             if not name: raise RuntimeError("CONSTANT2 needs name")
             val=vm.pop()
-            vm.add_fn(name, lambda vmm, n=val: vmm.push(n))
+            vm.add_fn(name, vm.make_op("PUSH", val))
         self.add_fn("CONSTANT2", W_CONSTANT2)
 
         def W_VARIABLE2(vm):
             name=vm._next_token()
             if not name: raise RuntimeError("VARIABLE2 needs name")
+            vm._reserve(1)
             addr=vm.here
             vm.heap[addr]=0; vm.here+=1
-            vm.add_fn(name, lambda vmm, a=addr: vmm.push(a))
+            vm.add_fn(name, vm.make_op("PUSH", addr))
         self.add_fn("VARIABLE2", W_VARIABLE2)
 
 # Run interactive if called directly
@@ -9,22 +9,48 @@ import os
 
 from Extn import install_extn
 
+IMAGE = "pf.img"    # dictionary snapshot written after 0.txt loads
+
+
+def image_is_fresh():
+    # Usable only if newer than every source it could have been built from
+    try:
+        t = os.stat(IMAGE)[8]
+    except OSError:
+        return False
+    for f in os.listdir():
+        if (f.endswith(".py") or f.endswith(".txt")) and os.stat(f)[8] > t:
+            return False
+    return True
 
-def main():
-    print("PyForth")
-    vm = ForthVM()
 
+def boot():
+    vm = ForthVM()
     install_extn(vm)
 
-    # Auto-load 0.txt if present (silently)
+    if image_is_fresh():
+        try:
+            vm.load_image(IMAGE)
+            return vm
+        except Exception as e:
+            print("ERR: image:", e)
+            vm = ForthVM()
+            install_extn(vm)
+
+    # Auto-load 0.txt if present (silently), then snapshot the result
     try:
         if "0.txt" in os.listdir():
             vm.interpret( '0 load' )
+            vm.save_image(IMAGE)
     except Exception:
         pass
+    return vm
+
 
+def main():
+    print("PyForth")
+    vm = boot()
     vm.repl()
 
 if __name__ == "__main__":
     main()
-
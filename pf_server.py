@@ -0,0 +1,148 @@
+#!/usr/bin/python3
+
+# pf_server.py
+# Multi-session TCP REPL. Every connection gets its own stacks, BASE,
+# compiler state and output; the dictionary is shared.
+#
+#   python3 pf_server.py [port]          then e.g.  nc 127.0.0.1 4444
+#
+# One lock guards the VM: a session swaps its state in, interprets one
+# line and swaps it out, so a definition is visible to every session as
+# soon as its ';' has run. MS/SLEEP hand the lock over while they sleep.
+# Output is collected per session and sent after the lock is released.
+
+import socket, sys, threading, time
+
+from forth_vm import ExitFrame, Output
+
+PORT = 4444
+
+# ForthVM attributes that belong to a session, not to the dictionary
+SESSION_STATE = ("S", "R", "frames", "base", "compiling",
+                 "current_code_list", "current_code_cfaddr", "current_header", "ctrl_stack",
+                 "pending_does", "runtime_created_header",
+                 "_input_buffer", "_in_pointer", "out", "_task")
+
+
+class Session:
+    def __init__(self, conn):
+        self.conn = conn
+        self.parts = []         # pending output (this is the Output's sink)
+        self.state = {
+            "S": [], "R": [], "frames": [], "base": 10, "compiling": False,
+            "current_code_list": None, "current_code_cfaddr": None,
+            "current_header": None, "ctrl_stack": [], "pending_does": [],
+            "runtime_created_header": None,
+            "_input_buffer": [], "_in_pointer": 0,
+            "out": Output(self), "_task": None, "_py_lines": None,
+        }
+
+    def write(self, s):
+        self.parts.append(s)
+
+    def send(self, text=""):
+        text = "".join(self.parts) + text
+        self.parts = []
+        if text:
+            self.conn.sendall(text.encode())
+
+
+def save_state(vm):
+    st = {name: getattr(vm, name) for name in SESSION_STATE}
+    st["_py_lines"] = getattr(vm, "_py_lines", None)     # Extn <P capture
+    return st
+
+def load_state(vm, st):
+    for name in SESSION_STATE:
+        setattr(vm, name, st[name])
+    if st["_py_lines"] is not None:
+        vm._py_lines = st["_py_lines"]
+    elif hasattr(vm, "_py_lines"):
+        del vm._py_lines
+
+
+class Server:
+    def __init__(self, vm, host="127.0.0.1", port=PORT):
+        self.vm = vm
+        self.lock = threading.Lock()
+        self.current = None     # session holding the lock
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.listen(16)
+        self.port = self.sock.getsockname()[1]
+        vm._sleep = self._sleep
+
+    def serve_forever(self):
+        while True:
+            conn, _ = self.sock.accept()
+            t = threading.Thread(target=self._serve, args=(conn,))
+            t.daemon = True
+            t.start()
+
+    def _serve(self, conn):
+        s = Session(conn)
+        try:
+            s.send("PyForth\nok> ")
+            f = conn.makefile("r")
+            for line in f:
+                alive = self.run(s, line.rstrip("\r\n"))
+                s.send("ok> " if alive else "")
+                if not alive: break
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+    def run(self, s, line):
+        """Interpret one line for session s; False once it said BYE."""
+        vm = self.vm
+        alive = True
+        with self.lock:
+            outer = save_state(vm)
+            load_state(vm, s.state)
+            self.current = s
+            try:
+                vm.interpret(line)
+            except ExitFrame:
+                pass
+            except SystemExit:
+                alive = False
+            except Exception as e:
+                vm.out.write(f"ERR: {e}\n")
+                vm._panic()
+            finally:
+                vm.out.flush()
+                s.state = save_state(vm)
+                load_state(vm, outer)
+                self.current = None
+        return alive
+
+    def _sleep(self, secs):
+        # Called under the lock by MS/SLEEP: let other sessions run meanwhile
+        s = self.current
+        vm = self.vm
+        st = save_state(vm)
+        vm.out.flush()
+        self.lock.release()
+        try:
+            if s is not None: s.send()
+            time.sleep(secs)
+        finally:
+            self.lock.acquire()
+            load_state(vm, st)
+            self.current = s
+
+
+def main():
+    from pf import boot
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PORT
+    server = Server(boot(), port=port)
+    print(f"PyForth server on port {server.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,44 @@
 # pin_ext.py
 # Forth extension for GPIO pin manipulation
 
-from machine import Pin # Corrected import statement
+from machine import Pin, Timer
 
 from forth_vm import ForthVM
+
+try:
+    from time import ticks_us, ticks_add, ticks_diff, sleep_us
+except ImportError:     # CPython
+    from time import perf_counter_ns, sleep
+    def ticks_us(): return perf_counter_ns() // 1000
+    def ticks_add(t, d): return t + d
+    def ticks_diff(a, b): return a - b
+    def sleep_us(us): sleep(us / 1e6)
+
 # A dictionary to hold our pin objects
 pin_objects = {}
+# pin number -> its bound Pin.value, what the fast words call
+pin_values = {}
+# pin number -> the mode it was last set to (Pin.mode() isn't on every port)
+pin_modes = {}
+
+def _pin_value(pin_num, mode=None):
+    """Bound value method of pin n, creating the pin (as mode) if needed;
+       a pin set up in another mode is switched to mode."""
+    value = pin_values.get(pin_num)
+    if value is None:
+        if pin_num not in pin_objects:
+            if mode is None:
+                raise RuntimeError(f"Pin {pin_num} not initialized. Use IN /PIN or OUT /PIN first.")
+            pin_objects[pin_num] = Pin(pin_num, mode=mode)
+            pin_modes[pin_num] = mode
+        value = pin_values[pin_num] = pin_objects[pin_num].value
+    if mode is not None and pin_modes.get(pin_num) != mode:
+        try:
+            pin_objects[pin_num].init(mode=mode)
+        except Exception as e:
+            raise RuntimeError(f"Pin {pin_num} mode change failed: {e}")
+        pin_modes[pin_num] = mode
+    return value
 
 # Forth word: <mode> <pin_number> /PIN
 def prim_pin(vm):
@@ -27,6 +60,8 @@ def prim_pin(vm):
             pin_objects[pin_num] = Pin(pin_num, mode=pin_mode)
         else:
             pin_objects[pin_num].init(mode=pin_mode)
+        pin_modes[pin_num] = pin_mode
+        pin_values[pin_num] = pin_objects[pin_num].value
     except Exception as e:
         raise RuntimeError(f"Pin {pin_num} initialization failed: {e}")
 
@@ -35,17 +70,11 @@ def prim_pin_set_state(vm):
     """( state n -- ) Sets the state of pin n."""
     pin_num = vm.pop()
     state = vm.pop()
-    if pin_num not in pin_objects:
-        raise RuntimeError(f"Pin {pin_num} not initialized. Use IN /PIN or OUT /PIN first.")
-    
-    pin = pin_objects[pin_num]
+    value = _pin_value(pin_num)
+    if state != 0 and state != 1:
+        raise RuntimeError("Invalid state. Use 0 for off, 1 for on.")
     try:
-        if state == 0:
-            pin.off()
-        elif state == 1:
-            pin.on()
-        else:
-            raise RuntimeError("Invalid state. Use 0 for off, 1 for on.")
+        value(state)
     except Exception as e:
         raise RuntimeError(f"Failed to set state for pin {pin_num}: {e}")
 
@@ -53,19 +82,124 @@ def prim_pin_set_state(vm):
 def prim_pin_get_state(vm):
     """( n -- state ) Reads the state of pin n."""
     pin_num = vm.pop()
-    if pin_num not in pin_objects:
-        raise RuntimeError(f"Pin {pin_num} not initialized. Use IN /PIN or OUT /PIN first.")
-    
-    pin = pin_objects[pin_num]
+    value = _pin_value(pin_num)
     try:
-        state = pin.value()
+        state = value()
         vm.push(state)
     except Exception as e:
         raise RuntimeError(f"Failed to read state for pin {pin_num}: {e}")
 
+# ----- Pin handles: words bound to one pin's Pin.value -----
+
+def _make_pin_out(pin_num):
+    # make_op factory: ( level -- ) for an output pin
+    value = _pin_value(pin_num, Pin.OUT)
+    def pin_out(vm):
+        value(vm.pop())
+    return pin_out
+
+def _make_pin_in(pin_num):
+    # make_op factory: ( -- level ) for an input pin
+    value = _pin_value(pin_num, Pin.IN)
+    def pin_in(vm):
+        vm.push(value())
+    return pin_in
+
+# Forth word: <pin_number> PIN: <name>   then  1 <name> / 0 <name>
+def prim_pin_handle_out(vm):
+    """( n -- ) Defines name ( level -- ) writing pin n (made an output)."""
+    name = vm._next_token()
+    if not name: raise RuntimeError("PIN: needs a name")
+    vm.add_fn(name, vm.make_op("PIN-OUT", vm.pop()))
+
+# Forth word: <pin_number> PIN-IN: <name>   then  <name> ( -- level )
+def prim_pin_handle_in(vm):
+    """( n -- ) Defines name ( -- level ) reading pin n (made an input)."""
+    name = vm._next_token()
+    if not name: raise RuntimeError("PIN-IN: needs a name")
+    vm.add_fn(name, vm.make_op("PIN-IN", vm.pop()))
+
+# Forth word: <value> <addr> <n> PORT!
+def prim_port_store(vm):
+    """( value addr n -- ) Writes bit i of value to the pin numbered in cell addr+i."""
+    n = vm.pop(); addr = vm.pop(); bits = vm.pop()
+    for pin_num in vm.heap[addr:addr+n]:
+        _pin_value(pin_num)(bits & 1)
+        bits >>= 1
+
+# Forth word: <addr> <n> PIN-SEQ
+def prim_pin_seq(vm):
+    """( addr n -- ) Plays n steps of 3 cells from addr: pin, level, delay in us.
+       Delays run from the step's start on one clock, so the loop's own time
+       doesn't add up. Busy-waits: other tasks don't run meanwhile."""
+    n = vm.pop(); addr = vm.pop()
+    if n < 0 or addr < 0 or addr + 3 * n > len(vm.heap):
+        raise RuntimeError(f"PIN-SEQ: {n} steps at {addr} outside the heap")
+    cells = vm.heap[addr:addr + 3 * n]
+    steps = [(_pin_value(cells[i]), cells[i+1], cells[i+2]) for i in range(0, 3 * n, 3)]
+    t = ticks_us()
+    for value, level, delay in steps:
+        value(level)
+        if delay:
+            t = ticks_add(t, delay)
+            wait = ticks_diff(t, ticks_us())
+            if wait > 2000: sleep_us(wait - 1000)   # long gaps: sleep most of it
+            while ticks_diff(t, ticks_us()) > 0: pass
+        else:
+            t = ticks_us()
+
+# ----- Interrupt-driven handlers -----
+# IRQ and timer callbacks only post (xt, arg) to the VM's EventRing; the VM
+# runs xt ( arg -- ) at the next token boundary or PAUSE/MS point.
+
+# Forth word: <xt> <pin_number> ON-PIN-CHANGE
+def prim_on_pin_change(vm):
+    """( xt n -- ) Run xt ( level -- ) whenever pin n changes; xt 0 removes it."""
+    pin_num = vm.pop(); xt = vm.pop()
+    _pin_value(pin_num)
+    pin = pin_objects[pin_num]
+    if not xt:
+        pin.irq(handler=None)
+        return
+    post = vm.enable_events().post
+    def on_change(p):
+        post(xt, p.value())
+    pin.irq(handler=on_change, trigger=Pin.IRQ_RISING | Pin.IRQ_FALLING)
+
+# Forth word: <xt> <ms> EVERY
+def prim_every(vm):
+    """( xt ms -- ) Run xt ( count -- ) every ms milliseconds; count = ticks so far."""
+    ms = vm.pop(); xt = vm.pop()
+    if ms <= 0: raise RuntimeError("EVERY needs a period > 0")
+    post = vm.enable_events().post
+    count = [0]
+    def on_tick(t):
+        count[0] += 1
+        post(xt, count[0])
+    vm.timers.append(Timer(-1, period=ms, mode=Timer.PERIODIC, callback=on_tick))
+
+# Forth word: TIMERS-OFF
+def prim_timers_off(vm):
+    """( -- ) Stops every EVERY timer."""
+    for t in vm.timers:
+        t.deinit()
+    vm.timers = []
+
 def install_pin_ext(vm: ForthVM):
     """Installs the pin extension words into the Forth VM."""
+    vm.register_factory("PIN-OUT", _make_pin_out)
+    vm.register_factory("PIN-IN", _make_pin_in)
     vm.add_fn("/PIN", prim_pin)
     vm.add_fn("PIN!", prim_pin_set_state)
     vm.add_fn("PIN@", prim_pin_get_state)
+    vm.add_fn("PIN:", prim_pin_handle_out)
+    vm.add_fn("PIN-IN:", prim_pin_handle_in)
+    vm.add_fn("PORT!", prim_port_store)
+    vm.add_fn("PIN-SEQ", prim_pin_seq)
+    vm.timers = []
+    vm.add_fn("ON-PIN-CHANGE", prim_on_pin_change)
+    vm.add_fn("EVERY", prim_every)
+    vm.add_fn("TIMERS-OFF", prim_timers_off)
     print("Pin extension loaded.")
+
+install = install_pin_ext    # so PYTHON pin_ext.py installs it
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+
+from Extn import install_extn
+from forth_vm import ForthVM
+
+
+def arun(vm, lines):
+    async def main():
+        for line in lines:
+            await vm.ainterpret(line)
+    asyncio.run(main())
+
+
+def test_python_block_through_ainterpret():
+    vm = ForthVM()
+    install_extn(vm)
+    arun(vm, ["<P", "vm.push(7)", "P>",
+              ": F <P", "vm.push(8)", "P>", ";", "F"])
+    assert vm.S == [7, 8]
+
+
+def test_persistent_python_block_through_ainterpret():
+    vm = ForthVM()
+    install_extn(vm)
+    arun(vm, [": N <P+", "n = globals().get('n', 0) + 1", "vm.push(n)", "P>", ";",
+              "N N N"])
+    assert vm.S == [1, 2, 3]
+
+
+@pytest.mark.parametrize("line", ["' W EXECUTE", "X"])
+def test_nested_ms_does_not_block_the_loop(line):
+    vm = ForthVM()
+    vm.interpret(": W 1 20 MS 2 20 MS 3 ;  : X ['] W EXECUTE 4 ;")
+    vm._sleep = lambda secs: pytest.fail("time.sleep under ainterpret")
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(1)
+            await asyncio.sleep(0.005)
+
+    async def main():
+        t = asyncio.ensure_future(ticker())
+        t0 = time.monotonic()
+        await vm.ainterpret(line)
+        t.cancel()
+        return time.monotonic() - t0
+
+    assert asyncio.run(main()) >= 0.04
+    assert vm.S[:3] == [1, 2, 3]
+    assert len(ticks) > 2
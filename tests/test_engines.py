@@ -0,0 +1,101 @@
+import pytest
+
+from forth_vm import ForthVM
+
+ENGINES = ["tuple", "closure", "native"]
+
+
+def run(engine, src, line):
+    vm = ForthVM(engine=engine)
+    vm.interpret(src)
+    vm.interpret(line)
+    return vm.S
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_i_in_callee(engine):
+    assert run(engine, ": G I ;  : F 3 0 DO G LOOP ;", "F") == [0, 1, 2]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_exit_inside_do(engine):
+    src = ": F 10 0 DO I 3 = IF I EXIT THEN LOOP 99 ;  : H F 1+ ;"
+    assert run(engine, src, "H") == [4]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_r_stack_across_calls(engine):
+    src = ": G R> R> 2DUP >R >R ;  : F 5 >R 6 >R G R> R> 2DROP ;"
+    assert run(engine, src, "F") == [6, 5]
+
+
+def test_tuple_engine_deep_recursion():
+    src = ": DOWN DUP IF 1- RECURSE THEN ;"
+    assert run("tuple", src, "9000 DOWN") == [0]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("profiled", [False, True])
+def test_too_deep_recursion_is_return_stack_overflow(engine, profiled):
+    src = ": DOWN DUP IF 1- RECURSE THEN ;"
+    assert run(engine, src, "300 DOWN") == [0]
+    vm = ForthVM(engine=engine)
+    vm.interpret(src)
+    if profiled: vm.profile_on()
+    with pytest.raises(RuntimeError, match="Return stack overflow"):
+        vm.interpret("20000 DOWN")
+    vm._panic()
+    vm.interpret("3 DOWN")
+    assert vm.S == [0]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("optimize", [False, True])
+@pytest.mark.parametrize("body", ["DROP", "DUP", "SWAP", "OVER", "@", "!", "1 !",
+                                  "+", "OVER OVER", "SWAP DROP", "1 +",
+                                  "DUP NOT IF 1 THEN"])
+def test_underflow_is_runtime_error(engine, optimize, body):
+    vm = ForthVM(engine=engine, optimize=optimize)
+    vm.interpret(f": F {body} ;  : G F ;")
+    for line in ("F", "G"):
+        vm.S.clear()
+        with pytest.raises(RuntimeError, match="Stack underflow"):
+            vm.interpret(line)
+
+
+@pytest.mark.parametrize("body", ["1 +", "DUP NOT IF 1 THEN"])
+def test_profiled_superinstruction_underflow(body):
+    vm = ForthVM(optimize=True)
+    vm.interpret(f": F {body} ;")
+    with vm.profile():
+        with pytest.raises(RuntimeError, match="Stack underflow"):
+            vm.interpret("F")
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_bad_address_is_not_underflow(engine):
+    vm = ForthVM(engine=engine)
+    vm.interpret(": F 99999999 @ ;  : G 1 99999999 ! ;")
+    for line in ("F", "G"):
+        with pytest.raises(IndexError):
+            vm.interpret(line)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_profiled_i_and_exit(engine):
+    vm = ForthVM(engine=engine)
+    vm.interpret(": G I ;  : F 3 0 DO G LOOP ;"
+                 "  : X 10 0 DO I 3 = IF I EXIT THEN LOOP 99 ;  : H X 1+ ;")
+    with vm.profile():
+        vm.interpret("F H")
+    assert vm.S == [0, 1, 2, 4]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_profile_off_unbinds_words_defined_while_on(engine):
+    vm = ForthVM(engine=engine)
+    vm.interpret(": G 1 ;")
+    vm.interpret("PROFILE-ON  : F G G + ;  F DROP  PROFILE-OFF")
+    before = vm.profile_stats()
+    vm.interpret("F F 2DROP")
+    assert vm.profile_stats() == before
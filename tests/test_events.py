@@ -0,0 +1,65 @@
+from forth_vm import EventRing, ForthVM
+
+
+def test_post_fills_ring_then_counts_drops():
+    ev = EventRing(4)                   # one slot stays free: holds 3
+    assert [ev.post(1, i) for i in range(5)] == [True, True, True, False, False]
+    assert ev.dropped == 2
+
+
+def test_ring_wraps_around():
+    ev = EventRing(3)
+    for i in range(10):
+        assert ev.post(1, i)
+        h = ev.head
+        assert ev.args[h] == i
+        ev.head = (h + 1) % ev.size
+    assert ev.head == ev.tail and ev.dropped == 0
+
+
+def make_vm(size=64):
+    vm = ForthVM()
+    vm.interpret("VARIABLE LOG  : H LOG @ + LOG ! ;  : LOGGED LOG @ ;")
+    xt = vm._find_word("H")
+    return vm, vm.enable_events(size), xt
+
+
+def logged(vm):
+    vm.interpret("LOGGED")
+    return vm.S.pop()
+
+
+def test_events_run_at_the_next_token_on_their_own_stacks():
+    vm, ev, xt = make_vm()
+    vm.interpret("1 2")
+    ev.post(xt, 10); ev.post(xt, 20)
+    vm.interpret("3")
+    assert vm.S == [1, 2, 3]
+    assert logged(vm) == 30
+    assert ev.head == ev.tail
+
+
+def test_events_run_during_pause():
+    vm, ev, xt = make_vm()
+    vm.interpret(": W 5 PAUSE ;")
+    ev.post(xt, 7)
+    vm.run(vm.prepare("W"))
+    assert logged(vm) == 7
+
+
+def test_dropped_events_never_run():
+    vm, ev, xt = make_vm(size=3)
+    posted = [ev.post(xt, n) for n in (1, 2, 4)]
+    assert posted == [True, True, False] and ev.dropped == 1
+    vm.interpret("0 DROP")
+    assert logged(vm) == 3
+
+
+def test_failing_handler_does_not_stop_the_others(capsys):
+    vm, ev, xt = make_vm()
+    ev.post(vm._find_word("DROP"), 0)
+    ev.post(vm._find_word("+"), 0)      # underflow on its fresh stack
+    ev.post(xt, 5)
+    vm.interpret("0 DROP")
+    assert "ERR in handler +" in capsys.readouterr().out
+    assert logged(vm) == 5
@@ -0,0 +1,57 @@
+import pytest
+
+from forth_vm import ForthVM
+
+HEAPS = [{}, {"heap": "typed"}]
+
+
+@pytest.mark.parametrize("kw", HEAPS)
+def test_forget_reclaims_here(kw):
+    vm = ForthVM(**kw)
+    vm.interpret(": KEEP 1 ;")
+    here, latest, ops = vm.here, vm.latest, len(vm.ops)
+    vm.interpret(": A 1 2 + ;  VARIABLE V  CREATE T 10 CELLS ALLOT  FORGET A")
+    assert (vm.here, vm.latest, len(vm.ops)) == (here, latest, ops)
+
+
+@pytest.mark.parametrize("kw", HEAPS)
+def test_marker_reclaims_here_and_itself(kw):
+    vm = ForthVM(**kw)
+    here, latest, ops = vm.here, vm.latest, len(vm.ops)
+    vm.interpret("MARKER M  : A 1 ;  : B A A ;  M")
+    assert (vm.here, vm.latest, len(vm.ops)) == (here, latest, ops)
+    assert vm._find_word("M") is None
+
+
+@pytest.mark.parametrize("kw", HEAPS)
+def test_forget_restores_shadowed_names(kw):
+    vm = ForthVM(**kw)
+    index = {k: list(v) for k, v in vm._index.items()}
+    vm.interpret(": W 1 ;  MARKER M  : W 2 ;  : DUP 3 ;  : NEW 4 ;  M")
+    vm.interpret("W 5 DUP")
+    assert vm.S == [1, 5, 5]
+    assert vm._find_word("NEW") is None
+    del vm._index["W"]
+    assert vm._index == index
+
+
+def test_forget_unknown_word():
+    vm = ForthVM()
+    with pytest.raises(RuntimeError, match="FORGET: unknown word NOPE"):
+        vm.interpret("FORGET NOPE")
+
+
+def test_forget_below_fence():
+    vm = ForthVM()
+    with pytest.raises(RuntimeError, match="below the fence"):
+        vm.interpret("FORGET DUP")
+
+
+@pytest.mark.parametrize("kw", HEAPS)
+def test_space_is_reused_after_forget(kw):
+    vm = ForthVM(**kw)
+    vm.interpret("MARKER M  : A 1 2 + ;")
+    m = vm._find_word("M")
+    vm.interpret("M  : B 3 4 + ;  B")
+    assert vm._find_word("B") == m
+    assert vm.S == [7]
@@ -0,0 +1,59 @@
+import pytest
+
+import fake_machine
+
+fake_machine.install()
+
+import I2CExt
+from forth_vm import ForthVM
+
+
+class FlakyI2C(fake_machine.I2C):
+    # Fails writes to register 0x20 of any device
+    def writeto_mem(self, addr, memaddr, buf):
+        if memaddr == 0x20:
+            raise OSError("ENODEV")
+        super().writeto_mem(addr, memaddr, buf)
+
+
+def make_vm():
+    vm = ForthVM()
+    I2CExt.install(vm)
+    vm.i2c_buses[0] = bus = FlakyI2C(0)
+    return vm, bus
+
+
+def test_flush_merges_and_empties_queue():
+    vm, bus = make_vm()
+    vm.interpret("1 16 60 0 I2C-Q!  2 17 60 0 I2C-Q!  I2C-FLUSH")
+    assert bus.regs(60)[16:18] == bytes([1, 2])
+    assert bus.transactions == 1
+    assert vm.i2c_queue == []
+
+
+def test_failed_flush_keeps_unapplied_ops():
+    vm, bus = make_vm()
+    vm.interpret("1 16 60 0 I2C-Q!  9 32 60 0 I2C-Q!  3 48 60 0 I2C-Q!")
+    with pytest.raises(RuntimeError, match="2 queued ops not applied"):
+        vm.interpret("I2C-FLUSH")
+    assert bus.regs(60)[16] == 1
+    assert [op[3] for op in vm.i2c_queue] == [32, 48]
+    vm.interpret("I2C-Q-CLEAR")
+    assert vm.i2c_queue == []
+
+
+@pytest.mark.parametrize("src", ['60 0 I2C" A  (y) \\ z"  7',
+                                 ': W I2C" A  (y) \\ z" 7 ;  60 0 W'])
+def test_i2c_string_is_sent_verbatim(src):
+    vm, bus = make_vm()
+    vm.interpret(src)
+    # first byte 'A' is the register, the rest land from there on
+    assert bytes(bus.regs(60)[65:74]) == b"  (y) \\ z"
+    assert vm.S == [7]
+
+
+def test_i2c_string_unterminated():
+    vm, bus = make_vm()
+    with pytest.raises(RuntimeError, match="Unterminated"):
+        vm.interpret('60 0 I2C" A no end')
+    vm._panic()
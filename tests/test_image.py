@@ -0,0 +1,103 @@
+import pytest
+
+import forth_par
+from forth_vm import ForthVM
+
+HEAPS = [{}, {"heap": "typed"}]
+
+
+@pytest.mark.parametrize("kw", HEAPS)
+def test_image_keeps_ms_and_sleep(kw, tmp_path):
+    path = str(tmp_path / "w.img")
+    vm = ForthVM(**kw)
+    vm.interpret(": W 1 MS 2 ;  : Z 0 SLEEP 3 ;")
+    vm.save_image(path)
+    vm2 = ForthVM(**kw)
+    vm2.load_image(path)
+    vm2.interpret("W Z")
+    assert vm2.S == [2, 3]
+
+
+def test_par_map_after_ms():
+    vm = ForthVM()
+    forth_par.install(vm)
+    vm.interpret(": W 1 MS ;  : SQ DUP * ;")
+    vm.interpret("CREATE A 1 , 2 , 3 ,  ' SQ A 3 PAR-MAP")
+    vm.interpret("A @ A 1 + @ A 2 + @")
+    assert vm.S == [1, 4, 9]
+    forth_par.close(vm)
+
+
+def test_par_map_keeps_one_pool():
+    vm = ForthVM()
+    forth_par.install(vm)
+    vm.interpret(": SQ DUP * ;  CREATE A 2 ,")
+    for word in ("SQ", "CUBE"):
+        vm.interpret(f": CUBE DUP DUP * * ;  ' {word} A 1 PAR-MAP")
+        assert forth_par._pools == [vm._par_pool]
+    vm.interpret("A @")
+    assert vm.S == [64]
+    forth_par.close(vm)
+    assert forth_par._pools == []
+
+
+@pytest.mark.parametrize("kw", HEAPS)
+def test_marker_drops_forgotten_primitives(kw, tmp_path):
+    vm = ForthVM(**kw)
+    prims = dict(vm._prims)
+    for i in range(5):
+        vm.interpret("MARKER M")
+        vm.add_fn("X", lambda vm, i=i: vm.push(i))
+        vm.interpret(': Y ." hi" X ;  Y  M')
+    assert vm._prims == prims
+    assert len(vm._prim_keys) == len(prims)
+    # the key is free again, and the image holds the live function
+    vm.add_fn("X", lambda vm: vm.push(42))
+    assert vm._prims["X"] is not None
+    path = str(tmp_path / "x.img")
+    vm.save_image(path)
+    vm2 = ForthVM(**kw)
+    vm2.add_fn("X", vm._prims["X"])
+    vm2.load_image(path)
+    vm2.interpret("X")
+    assert vm2.S == [42]
+
+
+def test_forget_keeps_primitive_of_older_same_named_word():
+    vm = ForthVM()
+    fn = lambda vm: vm.push(1)
+    vm.add_fn("X", fn)
+    vm.interpret("MARKER M")
+    vm.add_fn("X", fn)
+    vm.interpret("M")
+    assert vm._prims["X"] is fn
+
+
+def test_compiled_string_op_carries_its_recipe():
+    vm = ForthVM()
+    vm.interpret(': W ." hi" ;')
+    ops = [op for op in vm.ops if callable(op) and hasattr(op, "recipe")]
+    assert ops[-1].recipe == ("PRINT", ("hi",))
+
+
+def test_python_file_recorded_once(tmp_path):
+    from Extn import install_extn
+    src = tmp_path / "ext.py"
+    src.write_text("def install(vm):\n    vm.add_fn('EXT', lambda vm: vm.push(5))\n")
+    vm = ForthVM()
+    install_extn(vm)
+    vm.interpret(f"MARKER M  PYTHON {src}  M  PYTHON {src}")
+    assert vm.py_files == [str(src)]
+
+
+@pytest.mark.parametrize("kw", HEAPS)
+def test_typed_heap_flag(kw, tmp_path):
+    typed = kw.get("heap") == "typed"
+    path = str(tmp_path / "f.img")
+    vm = ForthVM(**kw)              # the first VM of a mode builds the template
+    assert vm.typed_heap is typed
+    vm.save_image(path)
+    vm2 = ForthVM(**kw)             # later ones restore it
+    vm2.load_image(path)
+    assert vm2.typed_heap is typed
+    assert (vm2.ops is not vm2.heap) is typed
@@ -0,0 +1,40 @@
+import pytest
+
+import MemExt
+from forth_vm import ForthVM
+
+HEAPS = [{}, {"heap": "typed"}]
+
+
+def make_vm(kw):
+    vm = ForthVM(**kw)
+    MemExt.install(vm)
+    vm.interpret("CREATE A 1 , 2 , 3 , 4 , 5 ,")
+    return vm
+
+
+def cells(vm, n=5):
+    a = vm.run(vm.prepare("A"))[0]
+    return list(vm.heap[a:a+n])
+
+
+@pytest.mark.parametrize("kw", HEAPS)
+@pytest.mark.parametrize("line, expect", [
+    ("A A 1 + 4 MOVE", [1, 1, 2, 3, 4]),
+    ("A 1 + A 4 MOVE", [2, 3, 4, 5, 5]),
+    ("A A 1 + 4 CMOVE", [1, 1, 1, 1, 1]),
+    ("A 1 + A 4 CMOVE>", [5, 5, 5, 5, 5]),
+    ("A 1 + 3 300 FILL", [1, 44, 44, 44, 5]),
+    ("A 2 ERASE", [0, 0, 3, 4, 5]),
+])
+def test_block_words(kw, line, expect):
+    vm = make_vm(kw)
+    vm.interpret(line)
+    assert cells(vm) == expect
+
+
+@pytest.mark.parametrize("kw", HEAPS)
+def test_range_outside_heap(kw):
+    vm = make_vm(kw)
+    with pytest.raises(RuntimeError, match="FILL: .* outside the heap"):
+        vm.interpret(f"A {len(vm.heap)} 0 FILL")
@@ -0,0 +1,64 @@
+import io
+
+from forth_vm import ForthVM
+
+
+class Sink:
+    # Records each write() the VM makes
+    def __init__(self):
+        self.writes = []
+
+    def write(self, s):
+        self.writes.append(s)
+
+
+def make_vm():
+    vm = ForthVM()
+    sink = Sink()
+    vm.set_output(sink)
+    return vm, sink
+
+
+def test_cr_flushes_then_line_end():
+    vm, sink = make_vm()
+    vm.interpret(": W 1 . 2 . CR 3 . ;  W")
+    assert sink.writes == ["1 2 \n", "3 "]
+
+
+def test_flushes_at_512_pending_chars():
+    vm, sink = make_vm()
+    vm.interpret(": W 600 0 DO 42 EMIT LOOP ;  W")
+    assert sink.writes == ["*" * 512, "*" * 88]
+
+
+def test_flush_word():
+    vm, sink = make_vm()
+    vm.interpret("1 . FLUSH 2 . FLUSH FLUSH 3 .")
+    assert sink.writes == ["1 ", "2 ", "3 "]
+
+
+def test_nothing_written_until_a_flush_point():
+    vm, sink = make_vm()
+    vm.out.on_line = False
+    vm.interpret("1 . 2 .")
+    assert sink.writes == []
+    vm.interpret("CR")
+    assert sink.writes == ["1 2 \n"]
+
+
+def test_set_output_flushes_to_the_old_sink():
+    vm, sink = make_vm()
+    vm.out.on_line = False
+    vm.interpret("7 .")
+    buf = io.StringIO()
+    assert vm.set_output(buf) is sink
+    assert sink.writes == ["7 "]
+    vm.interpret("8 . FLUSH")
+    assert buf.getvalue() == "8 "
+    assert vm.set_output(None) is buf
+
+
+def test_default_sink_is_current_stdout(capsys):
+    vm = ForthVM()
+    vm.interpret('." hi" 5 . CR')
+    assert capsys.readouterr().out == "hi 5 \n"
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+import fake_machine
+
+fake_machine.install()
+
+import pin_ext
+from fake_machine import Pin
+from forth_vm import ForthVM
+
+
+def make_vm():
+    vm = ForthVM()
+    pin_ext.install(vm)
+    return vm
+
+
+def test_pin_handle_switches_input_to_output():
+    vm = make_vm()
+    vm.interpret("0 21 /PIN  21 PIN: LED  1 LED")
+    pin = pin_ext.pin_objects[21]
+    assert pin.mode == Pin.OUT
+    assert pin.value() == 1
+
+
+def test_pin_in_handle_switches_output_to_input():
+    vm = make_vm()
+    vm.interpret("1 22 /PIN  22 PIN-IN: BUTTON")
+    pin = pin_ext.pin_objects[22]
+    assert pin.mode == Pin.IN
+    pin.value(1)
+    vm.interpret("BUTTON")
+    assert vm.S == [1]
+
+
+def writes(pins, since):
+    return [(pid, level) for t, pid, level in Pin.log if pid in pins and t >= since]
+
+
+def test_pin_handle_writes_through_pin_value():
+    vm = make_vm()
+    t0 = time.perf_counter_ns()
+    vm.interpret("23 PIN: LED  : BLINK 1 LED 0 LED 1 LED ;  BLINK")
+    assert writes({23}, t0) == [(23, 1), (23, 0), (23, 1)]
+    assert vm.S == []
+
+
+def test_pin_handles_check_the_stack():
+    vm = make_vm()
+    vm.interpret("24 PIN: LED")
+    with pytest.raises(RuntimeError, match="Stack underflow"):
+        vm.interpret("LED")
+    vm._panic()
+
+
+def test_port_store_writes_bit_i_to_pin_i():
+    vm = make_vm()
+    vm.interpret("1 30 /PIN  1 31 /PIN  1 32 /PIN"
+                 "  CREATE PINS 30 , 31 , 32 ,")
+    t0 = time.perf_counter_ns()
+    vm.interpret("5 PINS 3 PORT!")      # 0b101
+    assert writes({30, 31, 32}, t0) == [(30, 1), (31, 0), (32, 1)]
+
+
+def test_pin_seq_keeps_its_delays():
+    vm = make_vm()
+    vm.interpret("1 33 /PIN  CREATE SEQ  33 , 1 , 3000 ,  33 , 0 , 1000 ,  33 , 1 , 0 ,")
+    t0 = time.perf_counter_ns()
+    vm.interpret("SEQ 3 PIN-SEQ")
+    log = [e for e in Pin.log if e[1] == 33 and e[0] >= t0]
+    assert [e[2] for e in log] == [1, 0, 1]
+    # delays add up on one clock from the start: writes due at 3 and 4 ms
+    at = [(t - t0) / 1000 for t, _, _ in log]
+    assert 3000 <= at[1] < 8000
+    assert 4000 <= at[2] < 9000
+
+
+def test_pin_seq_range_error():
+    vm = make_vm()
+    with pytest.raises(RuntimeError, match="outside the heap"):
+        vm.interpret("HERE 1000000 PIN-SEQ")
@@ -0,0 +1,48 @@
+import pytest
+
+from forth_vm import ForthVM
+
+HEAPS = [{}, {"heap": "typed"}, {"engine": "native"}]
+
+
+def size(vm):
+    return vm.here, len(vm.ops)
+
+
+@pytest.mark.parametrize("kw", HEAPS)
+def test_rebind_after_forget_reuses_space(kw):
+    vm = ForthVM(**kw)
+    vm.interpret(": SQ DUP * ;")
+    h = vm.prepare("SQ 1 +")
+    sizes = []
+    for i in range(20):
+        vm.interpret(f"MARKER M  : SQ DUP * {i} + ;")
+        assert vm.run(h, 3) == [10 + i]
+        vm.interpret("M")
+        sizes.append(size(vm))
+    assert len(set(sizes)) == 1
+
+
+@pytest.mark.parametrize("kw", HEAPS)
+def test_rebind_after_redefinition_reuses_space(kw):
+    vm = ForthVM(**kw)
+    vm.interpret(": SQ DUP * ;")
+    h = vm.prepare("SQ 1 +")
+    growth = []
+    for i in range(10):
+        before = size(vm)
+        vm.interpret(f": SQ DUP * {i} + ;")
+        defined = size(vm)
+        assert vm.run(h, 3) == [10 + i]
+        growth.append(size(vm) == defined)
+        assert size(vm) != before
+    assert all(growth)
+
+
+@pytest.mark.parametrize("kw", HEAPS)
+def test_rebind_to_longer_thread_moves(kw):
+    vm = ForthVM(**kw)
+    vm.interpret(": F 1 ;")
+    h = vm.prepare("F")
+    vm.interpret(": G 2 ;  : F G G + ;")
+    assert vm.run(h) == [4]
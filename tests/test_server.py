@@ -0,0 +1,43 @@
+import pytest
+
+from forth_vm import ForthVM
+from pf_server import Session, load_state, save_state
+
+
+def switch(vm, old, new):
+    if old is not None: old.state = save_state(vm)
+    load_state(vm, new.state)
+
+
+def test_definition_hidden_until_semicolon():
+    vm = ForthVM()
+    vm.interpret(": F 1 ;")
+    a = Session(None); b = Session(None)
+    switch(vm, None, a)
+    vm.interpret(": F 2")
+    switch(vm, a, b)
+    vm.interpret("F")               # the old F, not the half-built one
+    assert vm.S == [1]
+    vm.interpret(": G 3 ;")
+    switch(vm, b, a)
+    vm.interpret("; F G")
+    assert vm.S == [2, 3]
+    switch(vm, a, b)
+    vm.interpret("CLEAR F G")
+    assert vm.S == [2, 3]
+
+
+def test_self_reference_while_compiling():
+    vm = ForthVM()
+    vm.interpret(": DOWN DUP IF 1- DOWN THEN ;  5 DOWN")
+    assert vm.S == [0]
+
+
+def test_failed_definition_stays_hidden():
+    vm = ForthVM()
+    vm.interpret(": F 1 ;")
+    with pytest.raises(RuntimeError):
+        vm.interpret(": F 2 NO-SUCH-WORD ;")
+    vm._panic()
+    vm.interpret("F")
+    assert vm.S == [1]
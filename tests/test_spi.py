@@ -0,0 +1,38 @@
+import pytest
+
+import fake_machine
+
+fake_machine.install()
+
+import SPIExt
+from forth_vm import ForthVM
+
+
+def make_vm():
+    vm = ForthVM()
+    SPIExt.install(vm)
+    vm.spi_buses[0] = bus = fake_machine.SPI(0)
+    return vm, bus
+
+
+@pytest.mark.parametrize("text", ["a  b", "(y) x", "back\\slash", " lead"])
+@pytest.mark.parametrize("compiled", [False, True])
+def test_spi_string_round_trip(text, compiled):
+    vm, bus = make_vm()
+    if compiled:
+        vm.interpret(f': W SPI" {text}" 7 ;  0 W')
+    else:
+        vm.interpret(f'0 SPI" {text}"  7')
+    assert bus.last == text.encode()
+    assert vm.S == [7]
+    # the loopback hands the same bytes back
+    vm.interpret(f"HERE {len(text)} 0 SPI-READ-INTO")
+    assert list(vm.heap[vm.here:vm.here+len(text)]) == list(text.encode())
+
+
+def test_spi_string_unterminated():
+    vm, bus = make_vm()
+    with pytest.raises(RuntimeError, match="Unterminated"):
+        vm.interpret('0 SPI" no end')
+    vm._panic()
+    assert bus.written == 0
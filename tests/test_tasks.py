@@ -0,0 +1,72 @@
+import pytest
+
+from forth_vm import ForthVM
+
+HEAPS = [{}, {"heap": "typed"}]
+
+COUNTER = "VARIABLE N  TASK T1  : COUNTER T1 ACTIVATE BEGIN N @ 1 + N ! PAUSE AGAIN ;"
+
+
+def n(vm):
+    vm.interpret("N @")
+    return vm.S.pop()
+
+
+def test_activate_runs_rest_of_word_in_task():
+    vm = ForthVM()
+    vm.interpret(COUNTER + "  COUNTER 7")
+    # the operator carries on after ACTIVATE; the task hasn't run yet
+    assert vm.S == [7] and n(vm) == 0
+    assert vm.tasks[0].state == "ready"
+
+
+def test_each_pause_gives_the_task_one_turn():
+    vm = ForthVM()
+    vm.interpret(COUNTER + "  COUNTER")
+    vm.interpret("PAUSE PAUSE PAUSE")
+    assert n(vm) == 3
+
+
+def test_stop_ends_the_task():
+    vm = ForthVM()
+    vm.interpret("VARIABLE N  TASK T1  : ONCE T1 ACTIVATE 5 N ! STOP 6 N ! ;")
+    vm.interpret("ONCE PAUSE PAUSE")
+    assert n(vm) == 5
+    assert vm.tasks[0].state == "stopped"
+
+
+def test_stop_outside_a_task():
+    vm = ForthVM()
+    with pytest.raises(RuntimeError, match="STOP outside a task"):
+        vm.interpret("STOP")
+
+
+def test_task_has_its_own_stack():
+    vm = ForthVM()
+    vm.interpret("TASK T1  : W T1 ACTIVATE 1 2 3 PAUSE ;  W PAUSE")
+    assert vm.S == []
+    assert vm.tasks[0].S == [1, 2, 3]
+
+
+def test_ms_lets_other_tasks_run():
+    vm = ForthVM()
+    vm.interpret("VARIABLE N  TASK T1"
+                 "  : TICK T1 ACTIVATE BEGIN N @ 1 + N ! 5 MS AGAIN ;  TICK")
+    vm.interpret("60 MS")
+    # about a dozen turns, each asleep 5 ms; the operator didn't just sleep
+    assert 3 <= n(vm) <= 13
+
+
+@pytest.mark.parametrize("kw", HEAPS)
+def test_tasks_survive_an_image(kw, tmp_path):
+    path = str(tmp_path / "t.img")
+    vm = ForthVM(**kw)
+    vm.interpret(COUNTER + "  TASK T2  COUNTER PAUSE")
+    vm.save_image(path)
+    vm2 = ForthVM(**kw)
+    vm2.load_image(path)
+    assert [t.name for t in vm2.tasks] == ["T1", "T2"]
+    assert all(t.state == "idle" for t in vm2.tasks)
+    vm2.interpret("T2 COUNTER PAUSE PAUSE")
+    assert vm2.S == [1]
+    assert n(vm2) == 3
@@ -0,0 +1,52 @@
+from forth_vm import ForthVM
+
+
+def test_line_cache_reuses_tokens():
+    vm = ForthVM()
+    vm.interpret("1 2 +")
+    toks = vm._line_cache["1 2 +"]
+    vm.interpret("1 2 +")
+    assert vm._line_cache["1 2 +"] is toks
+    assert vm.S == [3, 3]
+
+
+def test_line_cache_evicts_least_recently_used():
+    vm = ForthVM()
+    vm.line_cache_size = 3
+    for line in ("1", "2", "3", "1", "4"):     # "1" used again: "2" goes
+        vm.interpret(line)
+    assert list(vm._line_cache) == ["3", "1", "4"]
+
+
+def test_scanned_lines_are_cached_too():
+    vm = ForthVM()
+    line = '." a  b" ( c ) 5 \\ d'
+    vm.interpret(line)
+    assert vm._line_cache[line] == (("DOTQUOTE", "a  b"), "5")
+
+
+def test_redefinition_invalidates_resolved_tokens():
+    vm = ForthVM()
+    vm.interpret(": SQ DUP * ;  3 SQ")
+    vm.interpret(": SQ DUP + ;  3 SQ")
+    assert vm.S == [9, 6]
+
+
+def test_forget_invalidates_resolved_tokens():
+    vm = ForthVM()
+    vm.interpret(": SQ DUP * ;  MARKER M  : SQ DUP + ;  3 SQ  M  3 SQ")
+    assert vm.S == [6, 9]
+
+
+def test_base_change_invalidates_resolved_numbers():
+    vm = ForthVM()
+    vm.interpret("10  HEX 10  DECIMAL 10")
+    assert vm.S == [10, 16, 10]
+
+
+def test_resolved_cache_stays_bounded():
+    vm = ForthVM()
+    vm.line_cache_size = 4
+    for i in range(100):
+        vm.interpret(f"{i} DROP")
+    assert len(vm._resolved) <= 4 * vm.line_cache_size
@@ -0,0 +1,85 @@
+import re
+
+import pytest
+
+import VecExt
+from forth_vm import ForthVM
+
+HEAPS = [{}, {"heap": "typed"}]
+NUMPY = [True, False]
+
+
+@pytest.fixture(params=NUMPY, ids=["numpy", "plain"])
+def numpy(request, monkeypatch):
+    if request.param:
+        if VecExt.np is None: pytest.skip("NumPy not installed")
+    else:
+        monkeypatch.setattr(VecExt, "np", None)
+    return request.param
+
+
+def make_vm(kw):
+    vm = ForthVM(**kw)
+    VecExt.install(vm)
+    vm.interpret("CREATE A 3 , -1 , 4 , 1 ,  CREATE B 2 , 7 , 1 , 8 ,  CREATE C 4 CELLS ALLOT")
+    return vm
+
+
+def cells(vm, name, n=4):
+    a = vm.run(vm.prepare(name))[0]
+    return list(vm.heap[a:a+n])
+
+
+@pytest.mark.parametrize("kw", HEAPS)
+@pytest.mark.parametrize("line, name, expect", [
+    ("A B C 4 V+", "C", [5, 6, 5, 9]),
+    ("A B C 4 V*", "C", [6, -7, 4, 8]),
+    ("A B A 4 V+", "A", [5, 6, 5, 9]),
+    ("A 4 -2 VSCALE", "A", [-6, 2, -8, -2]),
+    ("A 4 VSORT", "A", [-1, 1, 3, 4]),
+    ("A 1 + 2 VSORT", "A", [3, -1, 4, 1]),
+])
+def test_vector_stores(kw, numpy, line, name, expect):
+    vm = make_vm(kw)
+    vm.interpret(line)
+    assert cells(vm, name) == expect
+    assert vm.S == []
+
+
+@pytest.mark.parametrize("kw", HEAPS)
+@pytest.mark.parametrize("line, expect", [
+    ("A 4 VSUM", 7),
+    ("A 0 VSUM", 0),
+    ("A B 4 VDOT", 6 - 7 + 4 + 8),
+    ("A 4 VMAX", 4),
+    ("B 2 + 2 VMAX", 8),
+])
+def test_vector_reductions(kw, numpy, line, expect):
+    vm = make_vm(kw)
+    vm.interpret(line)
+    assert vm.S == [expect]
+    assert type(vm.S[0]) is int
+
+
+@pytest.mark.parametrize("kw", HEAPS)
+@pytest.mark.parametrize("line, word", [
+    ("A B C 1000000 V+", "V+"),
+    ("-1 B C 2 V*", "V*"),
+    ("A -1 2 VSCALE", "VSCALE"),
+    ("A 1000000 VSUM", "VSUM"),
+    ("A 1000000 HERE + 1 VDOT", "VDOT"),
+    ("HERE 1000000 VSORT", "VSORT"),
+])
+def test_vector_range_errors(kw, numpy, line, word):
+    vm = make_vm(kw)
+    with pytest.raises(RuntimeError, match=re.escape(word) + ": .* outside the heap"):
+        vm.interpret(line)
+    vm._panic()
+
+
+@pytest.mark.parametrize("kw", HEAPS)
+def test_vmax_of_empty_range(kw, numpy):
+    vm = make_vm(kw)
+    with pytest.raises(RuntimeError, match="empty range"):
+        vm.interpret("A 0 VMAX")
+    vm._panic()